@@ -1,7 +1,8 @@
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
-from scipy import stats
+from costs import build_cost_models
+from startup import lazy_import
+from strategy_dsl import STRATEGIES, rule_to_signal
 
 def calculate_returns(df):
     
@@ -20,35 +21,44 @@ def calculate_returns(df):
     
     return df
 
-def add_technical_indicators(df):
+def compute_indicators(price):
     
-    df = df.copy()
-    
-    if isinstance(df['Close'], pd.DataFrame):
-        price = df['Close'].mean(axis=1)
-    else:
-        price = df['Close']
-    
-    df['SMA_20'] = price.rolling(window=20).mean()
-    df['SMA_50'] = price.rolling(window=50).mean()
+    # Formules communes : price peut être une Series (un actif) ou une matrice T×N (screener)
+    ind = {}
+    ind['SMA_20'] = price.rolling(window=20).mean()
+    ind['SMA_50'] = price.rolling(window=50).mean()
     
     delta = price.diff()
     gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
     loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
     rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
+    ind['RSI'] = 100 - (100 / (1 + rs))
     
-    df['EMA_12'] = price.ewm(span=12, adjust=False).mean()
-    df['EMA_26'] = price.ewm(span=26, adjust=False).mean()
+    ind['EMA_12'] = price.ewm(span=12, adjust=False).mean()
+    ind['EMA_26'] = price.ewm(span=26, adjust=False).mean()
     
-    df['MACD'] = df['EMA_12'] - df['EMA_26']
-    df['MACD_Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    df['MACD_Histogram'] = df['MACD'] - df['MACD_Signal']
+    ind['MACD'] = ind['EMA_12'] - ind['EMA_26']
+    ind['MACD_Signal'] = ind['MACD'].ewm(span=9, adjust=False).mean()
+    ind['MACD_Histogram'] = ind['MACD'] - ind['MACD_Signal']
     
-    df['BB_Middle'] = df['SMA_20']
+    ind['BB_Middle'] = ind['SMA_20']
     std_20 = price.rolling(window=20).std()
-    df['BB_Upper'] = df['BB_Middle'] + 2 * std_20
-    df['BB_Lower'] = df['BB_Middle'] - 2 * std_20
+    ind['BB_Upper'] = ind['BB_Middle'] + 2 * std_20
+    ind['BB_Lower'] = ind['BB_Middle'] - 2 * std_20
+    
+    return ind
+
+def add_technical_indicators(df):
+    
+    df = df.copy()
+    
+    if isinstance(df['Close'], pd.DataFrame):
+        price = df['Close'].mean(axis=1)
+    else:
+        price = df['Close']
+    
+    for name, values in compute_indicators(price).items():
+        df[name] = values
     
     df['Portfolio_Close'] = price
     
@@ -79,8 +89,71 @@ def get_statistics(df):
 def test_normality(df):
     
     returns = df['Returns_Log'].dropna()
+    stats = lazy_import("scipy.stats")
     return stats.shapiro(returns)[1]
 
+def histogram_density(returns, bins=50):
+    
+    # Histogramme pré-calculé : seuls les centres et densités des classes sont envoyés
+    values = np.asarray(returns, dtype=float)
+    density, edges = np.histogram(values, bins=bins, density=True)
+    centers = (edges[:-1] + edges[1:]) / 2
+    return centers, density, np.diff(edges)
+
+def kde_on_grid(returns, grid_size=512):
+    
+    # KDE gaussien par binning + convolution : coût O(n + g²) indépendant de n pour l'affichage
+    values = np.asarray(returns, dtype=float)
+    n = len(values)
+    if n < 2:
+        return None
+    bandwidth = 1.06 * values.std(ddof=1) * n ** (-1 / 5)
+    
+    # Série plate : largeur de bande nulle, pas de densité continue à estimer
+    if not np.isfinite(bandwidth) or bandwidth <= 0:
+        return None
+    lo = values.min() - 3 * bandwidth
+    hi = values.max() + 3 * bandwidth
+    
+    counts, edges = np.histogram(values, bins=grid_size, range=(lo, hi))
+    centers = (edges[:-1] + edges[1:]) / 2
+    dx = edges[1] - edges[0]
+    
+    half = int(min(grid_size // 2 - 1, np.ceil(4 * bandwidth / dx)))
+    offsets = np.arange(-half, half + 1) * dx
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    density = np.convolve(counts, kernel, mode='same') / (n * bandwidth * np.sqrt(2 * np.pi))
+    
+    return centers, density
+
+def qq_quantiles(returns, n_points=200, n_tail=25):
+    
+    # QQ-plot compressé : quantiles espacés uniformément en échelle normale, queues conservées
+    ndtr = lazy_import("scipy.special").ndtr
+    ndtri = lazy_import("scipy.special").ndtri
+    
+    values = np.asarray(returns, dtype=float)
+    n = len(values)
+    
+    if n <= n_points + 2 * n_tail:
+        sample = np.sort(values)
+        probs = (np.arange(1, n + 1) - 0.5) / n
+        return ndtri(probs), sample
+    
+    # Statistiques d'ordre extrêmes exactes par sélection partielle (pas de tri complet)
+    low = np.sort(np.partition(values, n_tail)[:n_tail])
+    high = np.sort(np.partition(values, n - n_tail)[n - n_tail:])
+    low_probs = (np.arange(1, n_tail + 1) - 0.5) / n
+    high_probs = (np.arange(n - n_tail + 1, n + 1) - 0.5) / n
+    
+    z_grid = np.linspace(ndtri(low_probs[-1]), ndtri(high_probs[0]), n_points + 2)[1:-1]
+    mid_probs = ndtr(z_grid)
+    middle = np.quantile(values, mid_probs)
+    
+    probs = np.concatenate([low_probs, mid_probs, high_probs])
+    sample = np.concatenate([low, middle, high])
+    return ndtri(probs), sample
+
 def calculate_sharpe_ratio(df, risk_free_rate=0.0):
     
     returns = df['Strategy_Returns'].dropna()
@@ -108,7 +181,7 @@ def calculate_win_rate(df):
     
     return winning_trades / total_trades
 
-def run_backtesting(df, initial_capital, strategy_type, transaction_fee=0.001):
+def run_backtesting(df, initial_capital, strategy_type, transaction_fee=0.001, cost_models=None, rule=None, signal=None, position_size=None):
     
     df = df.copy()
     
@@ -117,35 +190,46 @@ def run_backtesting(df, initial_capital, strategy_type, transaction_fee=0.001):
     else:
         price = df['Close']
 
-    df['Signal'] = 0.0
-    if strategy_type == "SMA Crossover (Trend)":
-        sma_20 = price.rolling(window=20).mean()
-        sma_50 = price.rolling(window=50).mean()
-        df.loc[sma_20 > sma_50, 'Signal'] = 1.0
-    elif strategy_type == "RSI Mean Reversion":
-        delta = price.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        df.loc[df['RSI'] < 30, 'Signal'] = 1.0
-        df.loc[df['RSI'] > 70, 'Signal'] = 0.0
-        df['Signal'] = df['Signal'].ffill().fillna(0)
-    else:  # Buy & Hold
-        df['Signal'] = 1.0
+    # Signal issu d'une règle DSL : stratégie prédéfinie ou règle personnalisée (entry, exit)
+    # Un signal précalculé (ex: position -1/0/1 d'une paire) remplace la règle
+    if signal is not None:
+        df['Signal'] = signal.reindex(df.index).fillna(0.0)
+    else:
+        if rule is None:
+            strategy = STRATEGIES.get(strategy_type, STRATEGIES["Buy & Hold"])
+            rule = (strategy["entry"], strategy["exit"])
+        df['Signal'] = rule_to_signal(df, price, *rule)
 
     df['Pct_Change'] = price.pct_change()
     df['Trade_Action'] = df['Signal'].diff()
     
+    # Taille de position (ex: ciblage de volatilité) : exposition = signal × taille
+    if position_size is not None:
+        df['Position'] = df['Signal'] * position_size.reindex(df.index).ffill().fillna(0.0)
+    else:
+        df['Position'] = df['Signal']
+    
+    # Modèle de coûts : composantes additives, chacune calculée en une passe vectorielle
+    if cost_models is None:
+        cost_models = build_cost_models(transaction_fee)
+    
+    trades = df['Position'].diff().to_numpy()
+    gross_returns = df['Position'].shift(1) * df['Pct_Change']
+    # Taille des ordres estimée sur la courbe brute (évite la récursion coûts ↔ capital)
+    gross_equity = (initial_capital * (1 + gross_returns.fillna(0)).cumprod()).shift(1).fillna(initial_capital)
+    notional = gross_equity.to_numpy() * np.nan_to_num(np.abs(trades))
+    
     df['Transaction_Cost'] = 0.0
-    df.loc[df['Trade_Action'] != 0, 'Transaction_Cost'] = transaction_fee
+    for name, model in cost_models.items():
+        df[f'Cout_{name}'] = model(df, price, trades, notional)
+        df['Transaction_Cost'] += df[f'Cout_{name}']
     
-    df['Strategy_Returns'] = df['Signal'].shift(1) * df['Pct_Change'] - df['Transaction_Cost']
+    df['Strategy_Returns'] = df['Position'].shift(1) * df['Pct_Change'] - df['Transaction_Cost']
     df['Equity_Curve'] = initial_capital * (1 + df['Strategy_Returns'].fillna(0)).cumprod()
     
     roll_max = df['Equity_Curve'].cummax()
-    drawdown = (df['Equity_Curve'] - roll_max) / roll_max
-    max_drawdown = abs(drawdown.min())
+    df['Drawdown'] = (df['Equity_Curve'] - roll_max) / roll_max
+    max_drawdown = abs(df['Drawdown'].min())
 
     gains = df.loc[df['Strategy_Returns'] > 0, 'Strategy_Returns'].sum()
     pertes = abs(df.loc[df['Strategy_Returns'] < 0, 'Strategy_Returns'].sum())
@@ -163,15 +247,21 @@ def run_backtesting(df, initial_capital, strategy_type, transaction_fee=0.001):
     if strategy_type == "Buy & Hold":
         df.iloc[0, df.columns.get_loc('Trade_Action')] = 1.0
 
-    journal = df[df['Trade_Action'] != 0].copy()
+    # Journal : entrées/sorties et ajustements de taille (toute barre qui paie des coûts)
+    rebalance = (df['Position'].diff().fillna(0) != 0) & (df['Trade_Action'] == 0)
+    journal = df[(df['Trade_Action'] != 0) | rebalance].copy()
+    previous_equity = df['Equity_Curve'].shift(1)
 
     if not journal.empty:
         journal['Action'] = journal['Trade_Action'].apply(lambda x: "🟢 ACHAT" if x > 0 else "🔴 VENTE")
+        journal.loc[rebalance[journal.index], 'Action'] = "⚖️ AJUSTEMENT"
         journal['Prix_Execution'] = price
-        journal['Frais'] = journal['Transaction_Cost'] * journal['Equity_Curve'].shift(1)
+        for name in cost_models:
+            # Coût en dollars sur le capital de la barre précédente (même base que les frais totaux)
+            journal[name] = journal[f'Cout_{name}'] * previous_equity[journal.index]
         journal['Cumulative_Returns'] = (journal['Equity_Curve'] - initial_capital) / initial_capital
     else:
-        journal = pd.DataFrame(columns=['Action', 'Prix_Execution', 'Frais', 'Cumulative_Returns'])
+        journal = pd.DataFrame(columns=['Action', 'Prix_Execution'] + list(cost_models) + ['Cumulative_Returns'])
 
     return df, total_return, max_drawdown, num_trades, profit_factor, sharpe_ratio, win_rate, journal
 
@@ -186,6 +276,7 @@ def calculate_correlation_matrix(symbols_data):
 
 def plot_pro_analysis(df):
     
+    go = lazy_import("plotly.graph_objects")
     high_idx = df['High'].idxmax()
     low_idx = df['Low'].idxmin()
     high_val = df['High'].max()
@@ -0,0 +1,312 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from result_cache import ResultCache
+
+MAX_WORKERS = int(os.getenv("NEXUS_API_WORKERS", str(os.cpu_count() or 2)))
+RESPONSE_TTL = int(os.getenv("NEXUS_API_TTL", "300"))
+MAX_BATCH = 500
+
+ENDPOINTS = ("statistics", "indicators", "backtest")
+
+class InvalidParameter(ValueError):
+    pass
+
+class SourceError(RuntimeError):
+    pass
+
+class SourceUnavailable(RuntimeError):
+    pass
+
+_pool = None
+_responses = ResultCache(max_bytes=int(os.getenv("NEXUS_API_CACHE_MB", "256")) * 1024 ** 2)
+
+def _clean(value):
+
+    # Conversion JSON : types NumPy -> natifs, NaN/inf -> null
+    if isinstance(value, dict):
+        return {str(k): _clean(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(v) for v in value]
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+def _parse_float(params, name, default, minimum):
+
+    try:
+        value = float(params.get(name, default))
+    except ValueError:
+        raise InvalidParameter(f"Paramètre '{name}' invalide: nombre attendu")
+    if not math.isfinite(value) or value < minimum:
+        raise InvalidParameter(f"Paramètre '{name}' invalide: valeur >= {minimum} attendue")
+    return value
+
+def validate_params(endpoint, params):
+
+    # Erreurs du client détectées avant tout calcul (réponse 400)
+    from strategy_dsl import STRATEGIES
+
+    for name in ("start", "end"):
+        if params.get(name):
+            try:
+                time.strptime(params[name], "%Y-%m-%d")
+            except ValueError:
+                raise InvalidParameter(f"Paramètre '{name}' invalide: date AAAA-MM-JJ attendue")
+
+    if endpoint == "backtest":
+        _parse_float(params, "capital", 1000, 1e-9)
+        _parse_float(params, "fee", 0.001, 0.0)
+        strategy = params.get("strategy")
+        if strategy is not None and strategy not in STRATEGIES:
+            raise InvalidParameter(f"Stratégie inconnue: '{strategy}' (disponibles: {', '.join(STRATEGIES)})")
+        for name in ("spread", "impact"):
+            if params.get(name, "0") not in ("0", "1"):
+                raise InvalidParameter(f"Paramètre '{name}' invalide: 0 ou 1 attendu")
+
+def _load_period(ticker, start, end):
+
+    from analytics import calculate_returns
+    from data_loader import CircuitOpenError
+    from prefetch import load_analysis_frame
+
+    # Cache d'historique propre à chaque worker (rafraîchi comme celui de l'application) ;
+    # une panne de la source n'est pas une absence de données (502/503, pas 404)
+    try:
+        full_data = load_analysis_frame(ticker)
+    except CircuitOpenError as e:
+        raise SourceUnavailable(str(e))
+    except Exception as e:
+        raise SourceError(f"Erreur de la source de données pour {ticker}: {e}")
+    if full_data is None or full_data.empty:
+        raise LookupError(f"Aucune donnée pour {ticker}")
+
+    # Même préparation que l'application : indicateurs sur l'historique, rendements sur la période
+    frame = full_data.loc[start or None:end or None]
+    frame = frame.loc[:, ~frame.columns.duplicated()]
+    if frame.empty:
+        raise LookupError(f"Période vide pour {ticker}")
+    return calculate_returns(frame)
+
+def compute(endpoint, ticker, params):
+
+    # Exécuté dans le pool de processus : imports lourds faits une fois par worker
+    from analytics import get_statistics, run_backtesting
+    from costs import build_cost_models
+
+    data = _load_period(ticker, params.get("start"), params.get("end"))
+
+    if endpoint == "statistics":
+        return {"ticker": ticker, "statistics": _clean(get_statistics(data))}
+
+    if endpoint == "indicators":
+        columns = params.get("columns").split(",") if params.get("columns") else None
+        unknown = [c for c in columns or [] if c not in data.columns]
+        if unknown:
+            raise InvalidParameter(f"Colonnes inconnues: {', '.join(unknown)}")
+        frame = data[columns] if columns else data
+        return {"ticker": ticker, "indicators": json.loads(frame.to_json(orient="split", date_format="iso"))}
+
+    capital = float(params.get("capital", 1000))
+    fee = float(params.get("fee", 0.001))
+    cost_models = build_cost_models(
+        fee,
+        spread=params.get("spread") == "1",
+        impact=params.get("impact") == "1"
+    )
+    df, total_return, max_drawdown, num_trades, profit_factor, sharpe_ratio, win_rate, journal = run_backtesting(
+        data, capital, params.get("strategy", "SMA Crossover (Trend)"), fee, cost_models
+    )
+    costs = {
+        name: (df[f"Cout_{name}"] * df["Equity_Curve"].shift(1)).sum()
+        for name in cost_models
+    }
+    return {
+        "ticker": ticker,
+        "backtest": _clean({
+            "total_return": total_return,
+            "max_drawdown": max_drawdown,
+            "num_trades": num_trades,
+            "profit_factor": profit_factor,
+            "sharpe_ratio": sharpe_ratio,
+            "win_rate": win_rate,
+            "final_capital": df["Equity_Curve"].iloc[-1],
+            "costs": costs,
+        }),
+    }
+
+def _normalize_ticker(ticker):
+
+    ticker = ticker.strip().upper()
+    return ticker if "-" in ticker else f"{ticker}-USD"
+
+def _response_key(endpoint, ticker, params):
+
+    return (endpoint, ticker, tuple(sorted(params.items())))
+
+def _build_response(status, payload):
+
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    return {
+        "status": status,
+        "body": body,
+        "etag": '"' + hashlib.sha1(body).hexdigest() + '"',
+        "created": time.time(),
+    }
+
+def _lookup(key):
+
+    cached = _responses.get(key)
+    if cached is not None and time.time() - cached["created"] <= RESPONSE_TTL:
+        return cached
+    return None
+
+def _cached_response(endpoint, ticker, params):
+
+    key = _response_key(endpoint, ticker, params)
+    cached = _lookup(key)
+    if cached is not None:
+        return cached
+
+    try:
+        response = _build_response(200, _pool.submit(compute, endpoint, ticker, params).result())
+    except InvalidParameter as e:
+        return _build_response(400, {"ticker": ticker, "error": str(e)})
+    except LookupError as e:
+        return _build_response(404, {"ticker": ticker, "error": str(e)})
+    except SourceUnavailable as e:
+        return _build_response(503, {"ticker": ticker, "error": str(e)})
+    except SourceError as e:
+        return _build_response(502, {"ticker": ticker, "error": str(e)})
+    except Exception as e:
+        return _build_response(500, {"ticker": ticker, "error": str(e)})
+
+    return _responses.put(key, response)
+
+class AnalyticsHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, etag=None):
+        if etag is not None and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", f"max-age={RESPONSE_TTL}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        endpoint = url.path.strip("/")
+
+        if endpoint == "health":
+            return self._send_json(200, {"status": "ok", "cache": _clean(_responses.stats())})
+        if endpoint not in ENDPOINTS:
+            return self._send_json(404, {"error": f"Endpoint inconnu: /{endpoint}"})
+
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        ticker = params.pop("ticker", None)
+        if not ticker:
+            return self._send_json(400, {"error": "Paramètre 'ticker' requis"})
+
+        try:
+            validate_params(endpoint, params)
+        except InvalidParameter as e:
+            return self._send_json(400, {"error": str(e)})
+
+        response = _cached_response(endpoint, _normalize_ticker(ticker), params)
+        self._send(response["status"], response["body"], response["etag"] if response["status"] == 200 else None)
+
+    def do_POST(self):
+        if urlparse(self.path).path.strip("/") != "batch":
+            return self._send_json(404, {"error": "Endpoint inconnu"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict) or not isinstance(request.get("params", {}), dict):
+                raise TypeError("objet JSON attendu")
+            if not isinstance(request.get("tickers"), list) or not all(isinstance(t, str) for t in request["tickers"]):
+                raise TypeError("liste de tickers attendue")
+            endpoint = request["endpoint"]
+            tickers = [_normalize_ticker(t) for t in request["tickers"]]
+            params = {k: str(v) for k, v in request.get("params", {}).items()}
+        except (ValueError, KeyError, TypeError):
+            return self._send_json(400, {"error": "Corps attendu: {endpoint, tickers, params}"})
+
+        if endpoint not in ENDPOINTS or len(tickers) > MAX_BATCH:
+            return self._send_json(400, {"error": f"Endpoint invalide ou plus de {MAX_BATCH} tickers"})
+        try:
+            validate_params(endpoint, params)
+        except InvalidParameter as e:
+            return self._send_json(400, {"error": str(e)})
+
+        # Lot : les tickers non cachés sont répartis en parallèle sur le pool
+        results = {}
+        pending = {}
+        for ticker in tickers:
+            cached = _lookup(_response_key(endpoint, ticker, params))
+            if cached is not None:
+                results[ticker] = json.loads(cached["body"])
+            else:
+                pending[ticker] = _pool.submit(compute, endpoint, ticker, params)
+
+        for ticker, future in pending.items():
+            try:
+                payload = future.result()
+                _responses.put(_response_key(endpoint, ticker, params), _build_response(200, payload))
+                results[ticker] = payload
+            except Exception as e:
+                results[ticker] = {"ticker": ticker, "error": str(e)}
+
+        response = _build_response(200, {"results": [results[t] for t in tickers]})
+        self._send(200, response["body"], response["etag"])
+
+def serve(host="127.0.0.1", port=8502, workers=MAX_WORKERS):
+
+    global _pool
+    _pool = ProcessPoolExecutor(max_workers=workers)
+    server = ThreadingHTTPServer((host, port), AnalyticsHandler)
+    print(f"API Nexus sur http://{host}:{port} ({workers} workers)")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        _pool.shutdown(cancel_futures=True)
+
+def main():
+
+    parser = argparse.ArgumentParser(description="API JSON des analyses Nexus Crypto Finance Pro")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    parser.add_argument("--fake", action="store_true", help="Source de données simulée (tests de charge)")
+    args = parser.parse_args()
+
+    if args.fake:
+        # Hérité par les processus du pool
+        os.environ["NEXUS_FAKE_SOURCE"] = "1"
+
+    serve(args.host, args.port, args.workers)
+
+if __name__ == "__main__":
+    main()
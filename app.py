@@ -1,20 +1,22 @@
+import os
+
 import streamlit as st
 import pandas as pd
-import yfinance as yf
-from data_loader import get_financial_data
+from startup import lazy_import, mark, get_startup_report
+from costs import build_cost_models
+from strategy_dsl import STRATEGIES, compile_rule
+from data_explorer import get_page, PAGE_SIZES
+from data_loader import get_fetch_stats, get_price_matrix
+from result_cache import analysis_cache
+from prefetch import get_analysis_frame, get_quote, get_prefetch_stats, start_prefetcher
+from screener import SCREENS, filter_screen, get_screen_results, get_universe, start_background_screener
+from pairs import backtest_pair, scan_pairs
+from garch import MIN_OBS as GARCH_MIN_OBS, MODELS, filter_volatility, fit_ticker, volatility_bands, volatility_target_sizes
 from analytics import (
     calculate_returns, 
     get_statistics,
     run_backtesting, 
-    test_normality, 
-    add_technical_indicators
-)
-from visualizations import (
-    plot_price_with_indicators,
-    plot_returns_histogram,
-    plot_qq_plot,
-    plot_cumulative_returns,
-    plot_equity_curve_with_drawdown
+    test_normality
 )
 
 st.set_page_config(
@@ -30,171 +32,23 @@ st.set_page_config(
 )
 
 # === Styles CSS ===
-st.markdown("""
-    <style>
-    
-    button[aria-label="View app menu"] {
-        display: none !important;
-    }
-    
-    .stApp {
-        background-color: #0e1117 !important;
-    }
-    
-    [data-testid="stAppViewContainer"] {
-        background-color: #0e1117 !important;
-    }
-        
-    h1, h2, h3, .stMarkdown p, .stMarkdown li {
-        color: white !important;
-    }
-    
-    [data-testid="stMetric"] {
-        background-color: rgba(128, 128, 128, 0.1) !important;
-        border: 1px solid rgba(128, 128, 128, 0.2) !important;
-        padding: 15px !important;
-        border-radius: 12px !important;
-    }
-    
-    .stButton > button[kind="primary"] {
-        background-color: #f0b90b !important;
-        color: black !important;
-        font-weight: bold !important;
-        border: none !important;
-        border-radius: 8px !important;
-        padding: 12px 24px !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    .stButton > button[kind="primary"]:hover {
-        background-color: #ffd700 !important;
-        transform: translateY(-2px) !important;
-        box-shadow: 0 4px 12px rgba(240, 185, 11, 0.4) !important;
-    }
-    
-    button[data-testid="baseButton-secondary"] {
-        background-color: transparent !important;
-        color: #f0b90b !important;
-        border: 2px solid #f0b90b !important;
-        font-weight: bold !important;
-        border-radius: 8px !important;
-        transition: all 0.3s ease !important;
-    }
-    
-    button[data-testid="baseButton-secondary"]:hover {
-        background-color: #f0b90b !important;
-        color: black !important;
-        transform: scale(1.02) !important;
-    }
-    
-    .stSlider label {
-        color: #f0b90b !important;
-        font-weight: bold !important;
-    }
-    
-    .stSlider > div > div > div > div {
-        background-color: #f0b90b !important;
-    }
-    
-    .stSlider [role="slider"] {
-        background-color: #f0b90b !important;
-    }
-    
-    .stSlider [data-baseweb="slider"] > div > div:first-child {
-        background-color: #f0b90b !important;
-    }
-    
-    .stSlider [data-testid="stTickBarMin"],
-    .stSlider [data-testid="stTickBarMax"],
-    .stSlider > div > div:last-child {
-        color: #f0b90b !important;
-    }
-        
-    .stSelectbox label {
-        color: #f0b90b !important;
-        font-weight: bold !important;
-    }
-    
-    .stSelectbox > div > div {
-        border-color: rgba(240, 185, 11, 0.3) !important;
-    }
-    
-    .stSelectbox > div > div:hover {
-        border-color: #f0b90b !important;
-        box-shadow: 0 0 0 1px #f0b90b !important;
-    }
-    
-    .stSelectbox svg {
-        fill: #f0b90b !important;
-    }
-    
-    .stNumberInput label {
-        color: #f0b90b !important;
-        font-weight: bold !important;
-    }
-    
-    .stNumberInput button:hover {
-        background-color: #f0b90b !important;
-        color: black !important;
-    }
-    
-    .stNumberInput input:focus {
-        border-color: #f0b90b !important;
-        box-shadow: 0 0 0 1px #f0b90b !important;
-    }
-        
-    .stTextInput label {
-        color: #f0b90b !important;
-        font-weight: bold !important;
-    }
-    
-    .stTextInput input:focus {
-        border-color: #f0b90b !important;
-        box-shadow: 0 0 0 1px #f0b90b !important;
-    }
-        
-    .stDateInput label {
-        color: #f0b90b !important;
-        font-weight: bold !important;
-    }
-    
-    .stDateInput input:focus {
-        border-color: #f0b90b !important;
-        box-shadow: 0 0 0 1px #f0b90b !important;
-    }
-        
-    .stTabs [data-baseweb="tab-list"] button {
-        color: white !important;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] button[aria-selected="true"] {
-        color: #f0b90b !important;
-        border-bottom: 2px solid #f0b90b !important;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] button:hover {
-        color: #f0b90b !important;
-    }   
-    
-    [data-testid="stSidebar"] h1,
-    [data-testid="stSidebar"] h2,
-    [data-testid="stSidebar"] h3 {
-        color: white !important;
-    }
-    
-    [data-testid="stSidebar"] {
-        background-color: #1e2329 !important;
-    }
-    
-    input:hover, select:hover {
-        border-color: #f0b90b !important;
-    }
-    </style>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def load_css():
+    # Feuille de style lue une seule fois par processus
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "style.css"), encoding="utf-8") as f:
+        return f"<style>{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
 
 def get_crypto_price(symbol):
     
+    # Cotation servie depuis le cache préchauffé si disponible
+    quote = get_quote(symbol)
+    if quote is not None:
+        return quote
+    
     try:
+        yf = lazy_import("yfinance")
         ticker_data = yf.Ticker(symbol)
         df = ticker_data.history(period="2d")
         if len(df) < 2: return 0.0, 0.0
@@ -206,6 +60,94 @@ def get_crypto_price(symbol):
     except:
         return 0.0, 0.0
 
+CUSTOM_STRATEGY = "Règle Personnalisée (DSL)"
+
+def prepare_analysis(full_data, start, end):
+    
+    data = full_data.loc[start:end].copy()
+    data = data.loc[:, ~data.columns.duplicated()].copy()
+    if data.empty:
+        return data, None, None
+    
+    # Indicateurs déjà calculés sur l'historique complet ; rendements rebasés sur la période
+    data = calculate_returns(data)
+    return data, get_statistics(data), test_normality(data)
+
+def build_explorer_frame(full_data, backtest):
+    
+    # Historique complet (prix, rendements, indicateurs) + signaux, positions et coûts du backtest
+    # (renseignés sur la période analysée, vides avant)
+    strategy_columns = [col for col in backtest.columns if col not in full_data.columns]
+    return full_data.join(backtest[strategy_columns])
+
+def fit_volatility(ticker, full_data, start, end, model):
+    
+    # Paramètres estimés sur l'historique antérieur à la période analysée, puis appliqués
+    # à la période (σ_t ne dépend que des rendements jusqu'à t-1) : pas de look-ahead
+    returns = full_data['Returns_Log']
+    history = returns.loc[:pd.Timestamp(start) - pd.Timedelta(days=1)]
+    in_sample = history.dropna().size < GARCH_MIN_OBS
+    try:
+        fit = fit_ticker(ticker, returns.loc[start:end] if in_sample else history, MODELS[model])
+    except ValueError:
+        # Période trop courte pour une estimation GARCH : pas de bandes ni de ciblage
+        return None, in_sample
+    return filter_volatility(fit, returns.loc[:end]), in_sample
+
+# Fragment : pagination, tri et filtres ne relancent que l'explorateur (Streamlit >= 1.37)
+_fragment = getattr(st, "fragment", lambda func: func)
+
+@_fragment
+def render_explorer(data, cache_key, file_name):
+    
+    # Explorateur paginé : seule la page visible est envoyée au navigateur
+    ex_col1, ex_col2, ex_col3, ex_col4 = st.columns(4)
+    with ex_col1:
+        ex_start = st.date_input("Début", value=data.index.min().date(), key="ex_start")
+    with ex_col2:
+        ex_end = st.date_input("Fin", value=data.index.max().date(), key="ex_end")
+    with ex_col3:
+        ex_sort = st.selectbox("Trier par", ["Date"] + list(data.columns), key="ex_sort")
+    with ex_col4:
+        ex_order = st.radio("Ordre", ["Décroissant", "Croissant"], horizontal=True, key="ex_order")
+    
+    ex_columns = st.multiselect("Colonnes", list(data.columns), default=list(data.columns), key="ex_columns")
+    
+    pg_col1, pg_col2 = st.columns([1, 3])
+    with pg_col1:
+        ex_page_size = st.selectbox("Lignes par page", PAGE_SIZES, index=2, key="ex_page_size")
+    with pg_col2:
+        ex_page = st.number_input("Page", min_value=1, value=1, step=1, key="ex_page")
+    
+    page_df, total_rows, num_pages, ex_page = get_page(
+        data,
+        page=ex_page,
+        page_size=ex_page_size,
+        start=ex_start,
+        end=ex_end,
+        columns=ex_columns,
+        sort_by=None if ex_sort == "Date" else ex_sort,
+        ascending=ex_order == "Croissant"
+    )
+    
+    st.caption(f"Page {ex_page} / {num_pages} — {total_rows:,} lignes filtrées")
+    st.dataframe(page_df, use_container_width=True)
+    
+    # Export sérialisé une seule fois par version des données
+    st.download_button(
+        "📥 Télécharger CSV Complet",
+        analysis_cache.get_or_compute(('csv',) + cache_key, lambda: data.to_csv().encode("utf-8")),
+        file_name,
+        mime="text/csv"
+    )
+
+@st.cache_resource
+def start_background_jobs():
+    # Un seul jeu de threads d'arrière-plan par processus serveur
+    return start_prefetcher(), start_background_screener()
+
+start_background_jobs()
+
 with st.sidebar:
     st.markdown("## <span style='color: #f0b90b;'>Nexus Cryptocurrency Finance Pro</span>", unsafe_allow_html=True)
     
@@ -213,6 +155,7 @@ with st.sidebar:
     st.sidebar.markdown("---")
     
     if st.button("Dashboard", use_container_width=True, key="home_btn"):
+        st.session_state['analyse_active'] = False
         st.rerun()
     st.sidebar.markdown("---")
     
@@ -220,14 +163,39 @@ with st.sidebar:
     st.sidebar.header("⚙️ Stratégie de Trading")
     strategy_choice = st.sidebar.selectbox(
         "Choisir une méthode",
-        ["SMA Crossover (Trend)", "RSI Mean Reversion", "Buy & Hold","Elliott & Fibonacci - Analyse Prédictive Pro"]
+        list(STRATEGIES) + [CUSTOM_STRATEGY, "Elliott & Fibonacci - Analyse Prédictive Pro"]
     )
     
+    # Règle personnalisée : compilée une fois, erreurs de syntaxe signalées immédiatement
+    custom_rule = None
+    if strategy_choice == CUSTOM_STRATEGY:
+        entry_rule = st.sidebar.text_area("Règle d'entrée", value="sma(close, 20) > sma(close, 50) and rsi(close, 14) < 60")
+        exit_rule = st.sidebar.text_input("Règle de sortie (optionnelle)", value="").strip() or None
+        try:
+            compile_rule(entry_rule)
+            if exit_rule:
+                compile_rule(exit_rule)
+            custom_rule = (entry_rule, exit_rule)
+        except ValueError as e:
+            st.sidebar.error(f"Règle invalide : {e}")
+        st.sidebar.caption("Fonctions : sma, ema, std, rsi, highest, lowest, lag, bb_upper, bb_lower, cross_above, cross_below, abs")
+    
     # === Paramètres Financiers ===
     st.sidebar.header("💰 Paramètres Financiers")
     initial_capital = st.sidebar.number_input("Capital Initial ($)", min_value=100, value=1000, step=100)
     transaction_fee = st.sidebar.slider("Frais de Transaction (%)", min_value=0.0, max_value=1.0, value=0.1, step=0.05) / 100
     
+    # === Modèle de Coûts ===
+    use_spread = st.sidebar.checkbox("Spread estimé (High/Low)", value=False)
+    use_impact = st.sidebar.checkbox("Impact de marché (√ volume)", value=False)
+    impact_coef = st.sidebar.slider("Coefficient d'impact", min_value=0.1, max_value=2.0, value=1.0, step=0.1) if use_impact else 1.0
+    
+    # === Volatilité GARCH ===
+    st.sidebar.header("📉 Volatilité (GARCH)")
+    garch_model = st.sidebar.selectbox("Modèle", list(MODELS))
+    use_vol_target = st.sidebar.checkbox("Ciblage de volatilité (taille de position)", value=False)
+    vol_target = st.sidebar.slider("Volatilité cible annuelle (%)", min_value=10, max_value=150, value=40, step=5) / 100 if use_vol_target else None
+    
     # === Sélection Crypto ===
     st.header("🔍 Sélection Crypto")
     ticker_input = st.sidebar.text_input("Saisir le Symbole (ex: BTC, ETH, SOL)", value="BTC").upper()
@@ -240,6 +208,11 @@ with st.sidebar:
         end_date = st.date_input("Au")
     
     analyze_btn = st.button("Lancer l'Analyse ", use_container_width=True, type="primary")
+
+    # L'analyse reste affichée lors des interactions (pagination, filtres...)
+    if analyze_btn:
+        st.session_state['analyse_active'] = True
+    analyze_btn = analyze_btn or st.session_state.get('analyse_active', False)
   
 # === PAGE PRINCIPALE ===
 
@@ -256,6 +229,10 @@ if 'analyze_btn' in locals() and analyze_btn:
             </div>
         """, unsafe_allow_html=True)
         st.stop() 
+    
+    if strategy_choice == CUSTOM_STRATEGY and custom_rule is None:
+        st.error("❌ Corrigez la règle personnalisée avant de lancer l'analyse.")
+        st.stop()
         
     st.markdown("""
         <div style='padding: 10px 0; margin-bottom: 20px;'>
@@ -336,28 +313,193 @@ if not analyze_btn:
                 </div>
             """, unsafe_allow_html=True)
 
+    # === TEMPS DE DÉMARRAGE ===
+    with st.expander("⏱️ Temps de Démarrage"):
+        startup_report = get_startup_report()
+        first_render = startup_report['marks'].get('premier_rendu')
+        if first_render is not None:
+            status = "✅" if first_render <= startup_report['target'] else "⚠️"
+            st.write(f"{status} Premier rendu : **{first_render:.2f}s** (objectif {startup_report['target']:.1f}s)")
+        st.dataframe(
+            pd.DataFrame(
+                sorted(startup_report['imports'].items(), key=lambda item: -item[1]),
+                columns=["Module", "Import (s)"]
+            ),
+            use_container_width=True
+        )
+
+    # === ÉTAT DU CACHE ===
+    with st.expander("📡 État du Cache de Données"):
+        cache_stats = get_prefetch_stats()
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Hits", cache_stats['hits'])
+        c2.metric("Misses", cache_stats['misses'])
+        c3.metric("Taux de Hit", f"{cache_stats['hit_rate']:.1%}")
+        st.dataframe(cache_stats['entries'], use_container_width=True)
+        
+        fetch_stats = get_fetch_stats()
+        f1, f2, f3, f4 = st.columns(4)
+        f1.metric("Requêtes Fusionnées", fetch_stats['coalesced'])
+        f2.metric("Nouvelles Tentatives", fetch_stats['retries'])
+        f3.metric("Replis sur Cache", fetch_stats['fallbacks'])
+        f4.metric("Circuit", "🔴 Ouvert" if fetch_stats['breaker_open'] else "🟢 Fermé")
+        
+        result_stats = analysis_cache.stats()
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Analyses en Cache", result_stats['entries'])
+        r2.metric("Taux de Hit Analyses", f"{result_stats['hit_rate']:.1%}")
+        r3.metric("Évictions", result_stats['evictions'])
+        r4.metric("Mémoire", f"{result_stats['bytes_used'] / 1024 ** 2:.0f} / {result_stats['max_bytes'] / 1024 ** 2:.0f} Mo")
+
+    # === SCREENER MULTI-CRYPTO ===
+    st.markdown("---")
+    st.markdown("### 🔎 Screener Technique Multi-Crypto")
+    
+    screen_results, screen_updated, screen_duration, screen_error = get_screen_results()
+    
+    if screen_error is not None:
+        st.warning(f"⚠️ Échec du dernier rafraîchissement du screener : {screen_error}")
+    
+    if screen_results is None:
+        if screen_error is None:
+            st.info("⏳ Calcul du screener en cours en arrière-plan...")
+    else:
+        selected_screens = st.multiselect("Filtres", list(SCREENS.keys()), key="screens")
+        filtered = filter_screen(screen_results, selected_screens)
+        
+        st.caption(
+            f"{len(filtered)} / {len(screen_results)} cryptos — "
+            f"mis à jour à {screen_updated:%H:%M:%S} (screen : {screen_duration:.3f}s)"
+        )
+        st.dataframe(
+            filtered.style.format({
+                'Prix': '{:,.4f} $',
+                'Variation_1J': '{:.2%}',
+                'RSI': '{:.1f}',
+                'SMA_20': '{:,.4f}',
+                'SMA_50': '{:,.4f}',
+                'BB_Upper': '{:,.4f}',
+                'BB_Lower': '{:,.4f}',
+                'MACD_Histogram': '{:.4f}',
+                'Vol_GARCH': '{:.1%}'
+            }),
+            use_container_width=True
+        )
+
+    # === SCANNER DE PAIRES ===
+    st.markdown("---")
+    st.markdown("### 🔗 Scanner de Paires (Cointégration)")
+    
+    pc1, pc2 = st.columns(2)
+    pairs_min_corr = pc1.slider("Corrélation minimale (élagage)", min_value=0.0, max_value=0.99, value=0.8, step=0.05, key="pairs_min_corr")
+    pairs_max_half_life = pc2.slider("Demi-vie maximale (jours)", min_value=5, max_value=250, value=60, step=5, key="pairs_max_half_life")
+    
+    if st.button("Scanner les Paires", key="pairs_btn"):
+        with st.spinner("🔄 Test de cointégration des paires de l'univers..."):
+            try:
+                pair_prices = get_price_matrix(get_universe(), period="2y")
+            except Exception as e:
+                st.error(f"❌ Impossible de charger les prix de l'univers : {e}")
+            else:
+                if pair_prices is None or pair_prices.empty:
+                    st.error("❌ Impossible de charger les prix de l'univers.")
+                else:
+                    ranked, scan_stats = scan_pairs(pair_prices, pairs_min_corr, max_half_life=pairs_max_half_life)
+                    st.session_state['pairs_scan'] = (pair_prices, ranked, scan_stats)
+    
+    if 'pairs_scan' in st.session_state:
+        pair_prices, ranked, scan_stats = st.session_state['pairs_scan']
+        st.caption(
+            f"{scan_stats['pairs_selected']} paires retenues — {scan_stats['pairs_tested']} testées sur "
+            f"{scan_stats['pairs_total']} ({scan_stats['assets']} actifs) en {scan_stats['duration']:.2f}s"
+        )
+        st.dataframe(
+            ranked.style.format({
+                'Correlation': '{:.3f}',
+                'Beta': '{:.3f}',
+                'Alpha': '{:.3f}',
+                'ADF_t': '{:.2f}',
+                'Seuil_Critique': '{:.2f}',
+                'Demi_Vie': '{:.1f}'
+            }),
+            use_container_width=True
+        )
+        
+        if not ranked.empty:
+            # Backtest du spread : mêmes frais et métriques que le backtest mono-actif
+            pair_labels = [f"{y} / {x}" for y, x in zip(ranked['Actif_Y'], ranked['Actif_X'])]
+            pair_idx = st.selectbox("Backtester la paire", range(len(pair_labels)), format_func=lambda k: pair_labels[k], key="pairs_choice")
+            pair = ranked.iloc[pair_idx]
+            pair_bt, pair_perf, pair_dd, pair_trades, pair_pf, pair_sharpe, pair_win, _ = backtest_pair(
+                pair_prices[f"{pair['Actif_Y']}-USD"], pair_prices[f"{pair['Actif_X']}-USD"],
+                pair['Beta'], initial_capital, transaction_fee
+            )
+            
+            b1, b2, b3, b4, b5 = st.columns(5)
+            b1.metric("Rendement Total", f"{pair_perf:.2%}")
+            b2.metric("Max Drawdown", f"{pair_dd * 100:.2f}%")
+            b3.metric("Nombre de Trades", int(pair_trades))
+            b4.metric("Ratio de Sharpe", f"{pair_sharpe:.2f}")
+            b5.metric("Taux de Réussite", f"{pair_win * 100:.1f}%")
+            
+            from visualizations import plot_equity_curve_with_drawdown
+            st.plotly_chart(plot_equity_curve_with_drawdown(pair_bt, initial_capital), use_container_width=True)
+
 else:
     # === ANALYSE COMPLÈTE ===
+    # Plotly n'est chargé qu'à la première analyse (la page d'accueil n'en a pas besoin)
+    from visualizations import (
+        plot_price_with_indicators,
+        plot_returns_histogram,
+        plot_qq_plot,
+        plot_cumulative_returns,
+        plot_equity_curve_with_drawdown,
+        plot_rolling_metrics,
+        plot_rolling_var,
+        plot_strategy_regimes
+    )
+    from risk import ROLLING_METHODS, compute_var_table
+    from rolling_metrics import ROLLING_WINDOWS, compare_strategies, compute_rolling_metrics
+    
     with st.spinner('🔄 Chargement et analyse des données...'):
-        full_data = get_financial_data(ticker)
+        full_data = get_analysis_frame(ticker)
 
         if full_data is None or full_data.empty:
             st.error(f"❌ Impossible de trouver {ticker}. Vérifiez le symbole.")
         else:
             actual_start = max(full_data.index.min().date(), start_date)
             actual_end = min(full_data.index.max().date(), end_date)
-            data = full_data.loc[actual_start:actual_end].copy()
-            data = data.loc[:, ~data.columns.duplicated()].copy()
+            
+            # Clé partagée entre sessions : même ticker, même période, même version des données
+            # (horodatage du rafraîchissement : la barre du jour évolue sans changer l'index)
+            cache_key = (ticker, str(actual_start), str(actual_end), full_data.attrs.get("updated_at"), full_data.index[-1])
+            
+            # === Calculs ===
+            data, metrics, p_val = analysis_cache.get_or_compute(
+                ('analyse',) + cache_key,
+                lambda: prepare_analysis(full_data, actual_start, actual_end)
+            )
     
             if not data.empty:
-                # === Calculs ===
-                data = calculate_returns(data)
-                data = add_technical_indicators(data)
-                metrics = get_statistics(data)
-                p_val = test_normality(data)
                 
                 st.success(f"✅ Analyse réussie pour {ticker}")
                 
+                # Volatilité conditionnelle : réestimation démarrée depuis les derniers paramètres du ticker
+                garch_key = cache_key + (garch_model,)
+                garch_fit, garch_in_sample = analysis_cache.get_or_compute(
+                    ('garch',) + garch_key,
+                    lambda: fit_volatility(ticker, full_data, actual_start, actual_end, garch_model)
+                )
+                position_size = volatility_target_sizes(garch_fit, vol_target) if vol_target and garch_fit else None
+                
+                # Backtesting calculé avant les onglets : ses rendements alimentent aussi le panneau de risque
+                backtest_key = cache_key + (strategy_choice, custom_rule, initial_capital, transaction_fee, use_spread, use_impact, impact_coef, garch_model, vol_target)
+                cost_models = build_cost_models(transaction_fee, spread=use_spread, impact=use_impact, impact_coef=impact_coef)
+                data_backtest, final_perf, max_drawdown, num_trades, profit_factor, sharpe_ratio, win_rate, journal = analysis_cache.get_or_compute(
+                    ('backtest',) + backtest_key,
+                    lambda: run_backtesting(data, initial_capital, strategy_choice, transaction_fee, cost_models, custom_rule, position_size=position_size)
+                )
+                
                 # === TAB LAYOUT (Organisation Professionnelle) ===
                 tab1, tab2, tab3, tab4 = st.tabs([
                     "📈 Graphiques Techniques", 
@@ -371,9 +513,31 @@ else:
                 # ============================================
                 with tab1:
                     st.plotly_chart(
-                        plot_price_with_indicators(data, ticker),
+                        analysis_cache.get_or_compute(
+                            ('fig_prix',) + garch_key,
+                            lambda: plot_price_with_indicators(
+                                data, ticker,
+                                volatility_bands(data['Portfolio_Close'], garch_fit) if garch_fit else None
+                            )
+                        ),
                         use_container_width=True
                     )
+                    
+                    if garch_fit:
+                        g1, g2, g3, g4 = st.columns(4)
+                        g1.metric("Vol Prévue (annualisée)", f"{garch_fit['next_vol'] * 252 ** 0.5:.2%}")
+                        g2.metric("Vol Long Terme", f"{garch_fit['long_run_vol'] * 252 ** 0.5:.2%}")
+                        g3.metric("Persistance", f"{garch_fit['persistence']:.3f}")
+                        g4.metric("Asymétrie (γ)", f"{garch_fit['gamma']:.3f}")
+                        if garch_in_sample:
+                            st.caption("⚠️ Historique antérieur insuffisant : GARCH estimé sur la période analysée (en échantillon).")
+                        else:
+                            st.caption("GARCH estimé sur l'historique antérieur à la période (hors échantillon).")
+                    else:
+                        st.info("ℹ️ Période trop courte pour l'estimation GARCH (100 rendements minimum).")
+                    
+                    if vol_target and garch_fit is None:
+                        st.warning("⚠️ Ciblage de volatilité ignoré : modèle GARCH indisponible.")
                 
                 # ============================================
                 # TAB 2: ANALYSES STATISTIQUES (NOUVEAU)
@@ -414,17 +578,51 @@ else:
                     
                     st.markdown("---")
                     
+                    # === PANNEAU DE RISQUE (VaR / CVaR) ===
+                    st.write("### ⚠️ Value at Risk & Expected Shortfall")
+                    risk_returns = pd.DataFrame({
+                        ticker: data['Returns_Simple'],
+                        f"Stratégie ({strategy_choice})": data_backtest['Strategy_Returns']
+                    }).dropna(how='all')
+                    
+                    var_table = analysis_cache.get_or_compute(
+                        ('risque',) + backtest_key,
+                        lambda: compute_var_table(risk_returns)
+                    )
+                    st.dataframe(var_table.T.style.format('{:.2%}'), use_container_width=True)
+                    st.caption("Pertes journalières positives : une VaR 95% de 4% signifie une perte supérieure à 4% un jour sur vingt.")
+                    
+                    rv_col1, rv_col2 = st.columns([1, 2])
+                    risk_method = rv_col1.radio("Méthode", list(ROLLING_METHODS), horizontal=True, key="risk_method")
+                    risk_window = rv_col2.select_slider("Fenêtre glissante (jours)", options=[30, 60, 90, 180, 250, 365], value=90, key="risk_window")
+                    rolling_var, rolling_cvar = analysis_cache.get_or_compute(
+                        ('risque_glissant', risk_method, risk_window) + backtest_key,
+                        lambda: ROLLING_METHODS[risk_method](risk_returns, window=risk_window, level=0.95)
+                    )
+                    st.plotly_chart(plot_rolling_var(rolling_var, rolling_cvar, 0.95, risk_method), use_container_width=True)
+                    
+                    st.markdown("---")
+                    
                     # === GRAPHIQUES STATISTIQUES  ===
                     st.write("### 📉 Visualisations Statistiques")
                     
                     # Histogramme + Densité
-                    st.plotly_chart(plot_returns_histogram(data), use_container_width=True)
+                    st.plotly_chart(
+                        analysis_cache.get_or_compute(('fig_hist',) + cache_key, lambda: plot_returns_histogram(data)),
+                        use_container_width=True
+                    )
                     
                     # QQ-Plot
-                    st.plotly_chart(plot_qq_plot(data), use_container_width=True)
+                    st.plotly_chart(
+                        analysis_cache.get_or_compute(('fig_qq',) + cache_key, lambda: plot_qq_plot(data)),
+                        use_container_width=True
+                    )
                     
                     # Rendements Cumulés
-                    st.plotly_chart(plot_cumulative_returns(data), use_container_width=True)
+                    st.plotly_chart(
+                        analysis_cache.get_or_compute(('fig_cumul',) + cache_key, lambda: plot_cumulative_returns(data)),
+                        use_container_width=True
+                    )
                 
                 # ============================================
                 # TAB 3: BACKTESTING (AMÉLIORÉ)
@@ -433,17 +631,40 @@ else:
                     st.write(f"### 💼 Backtesting: {strategy_choice}")
                     st.info(f"💰 Capital Initial: ${initial_capital:,.0f} | 💸 Frais: {transaction_fee*100:.2f}%")
                     
-                    # Backtesting avancé
-                    data_backtest, final_perf, max_drawdown, num_trades, profit_factor, sharpe_ratio, win_rate, journal = run_backtesting(
-                        data, initial_capital, strategy_choice, transaction_fee
+                    # Graphique Equity + Drawdown
+                    st.plotly_chart(
+                        analysis_cache.get_or_compute(
+                            ('fig_equity',) + backtest_key,
+                            lambda: plot_equity_curve_with_drawdown(data_backtest, initial_capital)
+                        ),
+                        use_container_width=True
                     )
                     
-                    # Graphique Equity + Drawdown
+                    # Métriques glissantes (toutes les fenêtres calculées en une passe O(n))
+                    rolling_window = st.radio(
+                        "Fenêtre des métriques glissantes (barres)", ROLLING_WINDOWS,
+                        index=1, horizontal=True, key="rolling_window"
+                    )
+                    rolling_df = analysis_cache.get_or_compute(
+                        ('metriques_glissantes',) + backtest_key,
+                        lambda: compute_rolling_metrics(data_backtest)
+                    )
                     st.plotly_chart(
-                        plot_equity_curve_with_drawdown(data_backtest, initial_capital),
+                        analysis_cache.get_or_compute(
+                            ('fig_glissant', rolling_window) + backtest_key,
+                            lambda: plot_rolling_metrics(rolling_df, rolling_window)
+                        ),
                         use_container_width=True
                     )
                     
+                    # Comparaison des régimes : Sharpe glissant des stratégies prédéfinies
+                    with st.expander("🔀 Comparaison des Régimes entre Stratégies"):
+                        regimes = analysis_cache.get_or_compute(
+                            ('regimes', rolling_window) + backtest_key,
+                            lambda: compare_strategies(data, initial_capital, STRATEGIES, transaction_fee, cost_models, rolling_window)
+                        )
+                        st.plotly_chart(plot_strategy_regimes(regimes, rolling_window), use_container_width=True)
+                    
                     # Métriques de Performance 
                     st.write("#### 📊 Métriques de Performance")
                     
@@ -464,6 +685,13 @@ else:
                     m7.metric("Capital Final", f"${final_val:,.2f}")
                     m8.metric("Frais Totaux", f"${total_fees:,.2f}")
                     
+                    # Décomposition des coûts par composante
+                    if len(cost_models) > 1:
+                        cost_cols = st.columns(len(cost_models))
+                        for cost_col, name in zip(cost_cols, cost_models):
+                            component = (data_backtest[f'Cout_{name}'] * data_backtest['Equity_Curve'].shift(1)).sum()
+                            cost_col.metric(f"Coût {name}", f"${component:,.2f}")
+                    
                     # Interprétation automatique
                     st.markdown("---")
                     st.write("#### 🔍 Interprétation des Résultats")
@@ -494,9 +722,9 @@ else:
                     if not journal.empty:
                         format_dict = {
                             'Prix_Execution': '{:.2f} $',
-                            'Frais': '{:.2f} $',
                             'Cumulative_Returns': '{:.2%}'
                         }
+                        format_dict.update({name: '{:.2f} $' for name in cost_models})
                         journal_unique = journal.loc[:, ~journal.columns.duplicated()].copy()
                         st.dataframe(journal_unique.style.format(format_dict), use_container_width=True)
                     else:
@@ -504,26 +732,22 @@ else:
                     
                     # Logique de la stratégie
                     with st.expander("📖 Voir la Logique de la Stratégie"):
-                        if strategy_choice == "SMA Crossover (Trend)":
-                            st.write("- 🟢 **Achat** : SMA(20) > SMA(50)")
-                            st.write("- 🔴 **Vente** : SMA(20) < SMA(50)")
-                        elif strategy_choice == "RSI Mean Reversion":
-                            st.write("- 🟢 **Achat** : RSI < 30 (Survendu)")
-                            st.write("- 🔴 **Vente** : RSI > 70 (Suracheté)")
+                        if custom_rule is not None:
+                            st.write(f"- 🟢 **Achat** : `{custom_rule[0]}`")
+                            st.write(f"- 🔴 **Vente** : `{custom_rule[1]}`" if custom_rule[1] else "- 🔴 **Vente** : dès que la règle d'entrée n'est plus vérifiée")
                         else:
-                            st.write("- 🟢 **Achat** : Début de période")
-                            st.write("- 🔴 **Vente** : Fin de période")
+                            for line in STRATEGIES[strategy_choice]["description"]:
+                                st.write(line)
                             
                 # ============================================
                 # TAB 4: DONNÉES BRUTES
                 # ============================================
                 with tab4:
                     st.write("### 📋 Données Historiques")
-                    st.dataframe(data.tail(100), use_container_width=True)
-                    
-                    st.download_button(
-                        "📥 Télécharger CSV Complet",
-                        data.to_csv(),
-                        f"{ticker}_{start_date}_{end_date}.csv",
-                        mime="text/csv"
-                    )
\ No newline at end of file
+                    explorer_data = analysis_cache.get_or_compute(
+                        ('explorateur',) + backtest_key,
+                        lambda: build_explorer_frame(full_data, data_backtest)
+                    )
+                    render_explorer(explorer_data, backtest_key, f"{ticker}_historique.csv")
+
+mark("premier_rendu")
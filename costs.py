@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+# Un modèle de coût est un callable (df, price, trades, notional) -> coût par barre,
+# exprimé en fraction du capital. Les composantes s'additionnent dans le backtest.
+
+def fixed_bps(bps):
+
+    fee = bps / 10_000
+
+    def model(df, price, trades, notional):
+        # Frais proportionnels à la variation d'exposition (identiques aux frais fixes pour un signal 0/1)
+        return fee * np.nan_to_num(np.abs(trades))
+
+    return model
+
+def estimate_spread(df, window=20):
+
+    # Estimateur de Corwin-Schultz à partir des High/Low de deux barres consécutives (sans look-ahead)
+    high = df['High'].to_numpy(dtype=float)
+    low = df['Low'].to_numpy(dtype=float)
+
+    hl = np.log(high / low) ** 2
+    beta = hl + np.concatenate([[np.nan], hl[:-1]])
+    high_2 = np.maximum(high, np.concatenate([[np.nan], high[:-1]]))
+    low_2 = np.minimum(low, np.concatenate([[np.nan], low[:-1]]))
+    gamma = np.log(high_2 / low_2) ** 2
+
+    denom = 3 - 2 * np.sqrt(2)
+    alpha = (np.sqrt(2 * beta) - np.sqrt(beta)) / denom - np.sqrt(gamma / denom)
+    spread = np.clip(2 * (np.exp(alpha) - 1) / (1 + np.exp(alpha)), 0, None)
+
+    return pd.Series(spread, index=df.index).rolling(window, min_periods=1).mean().to_numpy()
+
+def high_low_spread(window=20):
+
+    def model(df, price, trades, notional):
+        if not isinstance(df.get('High'), pd.Series) or not isinstance(df.get('Low'), pd.Series):
+            return np.zeros(len(df))
+        # Chaque exécution paie un demi-spread
+        half_spread = np.nan_to_num(estimate_spread(df, window) / 2)
+        return half_spread * np.nan_to_num(np.abs(trades))
+
+    return model
+
+def sqrt_market_impact(coef=1.0, window=20):
+
+    def model(df, price, trades, notional):
+        if not isinstance(df.get('Volume'), pd.Series):
+            return np.zeros(len(df))
+
+        # Impact par dollar échangé = coef × σ × √(taille de l'ordre / volume moyen en dollars),
+        # rapporté au capital comme les frais et le spread : × |variation d'exposition|
+        dollar_volume = (df['Volume'] * price).rolling(window, min_periods=1).mean().shift(1).to_numpy()
+        sigma = price.pct_change().rolling(window, min_periods=2).std().shift(1).to_numpy()
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            participation = np.where(dollar_volume > 0, notional / dollar_volume, 0.0)
+        impact = coef * np.nan_to_num(sigma) * np.sqrt(np.nan_to_num(participation))
+        return impact * np.nan_to_num(np.abs(trades))
+
+    return model
+
+def build_cost_models(transaction_fee=0.001, spread=False, impact=False, impact_coef=1.0):
+
+    models = {'Frais': fixed_bps(transaction_fee * 10_000)}
+    if spread:
+        models['Spread'] = high_low_spread()
+    if impact:
+        models['Impact'] = sqrt_market_impact(impact_coef)
+    return models
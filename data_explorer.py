@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = [25, 50, 100, 250, 500]
+
+def _align_timestamp(index, value):
+
+    ts = pd.Timestamp(value)
+    tz = getattr(index, 'tz', None)
+    if tz is not None and ts.tzinfo is None:
+        ts = ts.tz_localize(tz)
+    elif tz is None and ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return ts
+
+def get_date_bounds(df, start=None, end=None):
+
+    # Recherche dichotomique sur l'index trié : aucune copie des données
+    index = df.index
+    lo = 0
+    hi = len(index)
+
+    if start is not None:
+        lo = int(index.searchsorted(_align_timestamp(index, start), side='left'))
+    if end is not None:
+        # Borne de fin inclusive sur toute la journée
+        end_ts = _align_timestamp(index, end) + pd.Timedelta(days=1)
+        hi = int(index.searchsorted(end_ts, side='left'))
+
+    return lo, max(lo, hi)
+
+def _sorted_positions(values, k, ascending):
+
+    # Positions des k premières lignes triées, NaN toujours en fin de tableau
+    valid = np.flatnonzero(~pd.isna(values))
+    missing = np.flatnonzero(pd.isna(values))
+
+    if len(valid) == 0:
+        return missing[:k]
+
+    vals = values[valid]
+    if np.issubdtype(vals.dtype, np.number):
+        vals = vals.astype(float)
+        key = vals if ascending else -vals
+
+        # Sélection partielle O(n) puis tri des k premiers seulement
+        if k < len(key):
+            part = np.argpartition(key, k - 1)[:k]
+            order = part[np.argsort(key[part], kind='stable')]
+        else:
+            order = np.argsort(key, kind='stable')
+    else:
+        order = np.argsort(vals.astype(str), kind='stable')
+        if not ascending:
+            order = order[::-1]
+
+    return np.concatenate([valid[order], missing])[:k]
+
+def get_page(df, page=1, page_size=100, start=None, end=None,
+             columns=None, sort_by=None, ascending=True):
+
+    lo, hi = get_date_bounds(df, start, end)
+    total_rows = hi - lo
+    num_pages = max(1, int(np.ceil(total_rows / page_size)))
+    page = min(max(int(page), 1), num_pages)
+    offset = (page - 1) * page_size
+
+    if columns:
+        col_idx = [df.columns.get_loc(c) for c in columns if c in df.columns]
+    else:
+        col_idx = list(range(df.shape[1]))
+
+    if sort_by is None or sort_by not in df.columns:
+        # Tri chronologique : simple fenêtre sur l'index
+        if ascending:
+            positions = np.arange(lo + offset, min(hi, lo + offset + page_size))
+        else:
+            positions = np.arange(hi - 1 - offset, max(lo - 1, hi - 1 - offset - page_size), -1)
+    else:
+        values = df[sort_by].to_numpy()[lo:hi]
+        positions = lo + _sorted_positions(values, offset + page_size, ascending)[offset:]
+
+    page_df = df.iloc[positions, col_idx]
+    page_df = page_df.loc[:, ~page_df.columns.duplicated()]
+
+    return page_df, total_rows, num_pages, page
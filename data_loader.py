@@ -1,17 +1,223 @@
-import yfinance as yf
+import os
+import random
+import threading
+import time
+import zlib
+
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from result_cache import analysis_cache
+from startup import lazy_import
+from tick_bars import make_trade_source
+
+MAX_RETRIES = int(os.getenv("NEXUS_FETCH_RETRIES", "3"))
+RETRY_BASE_DELAY = 0.5
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+def download_history(ticker, period="max"):
+    
+    # Téléchargement brut, sans interface : les exceptions sont propagées à l'appelant
+    yf = lazy_import("yfinance")
+    data = yf.download(ticker, period=period, auto_adjust=True, progress=False)
+    
+    if data is not None and not data.empty:
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
+        data.columns = [str(col).capitalize() for col in data.columns]
+        return data.dropna()
+    return None
+
+def make_fake_source(latency=0.2, error_rate=0.0, seed=None, n_days=2000):
+    
+    # Source locale simulée (latence et erreurs injectées) pour tests et charge
+    rng = random.Random(seed)
+    
+    def source(ticker, period="max"):
+        time.sleep(latency)
+        if rng.random() < error_rate:
+            raise ConnectionError(f"Erreur simulée pour {ticker}")
+        
+        gen = np.random.default_rng(zlib.crc32(ticker.encode()))
+        index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=n_days, freq="D")
+        close = 100 * np.exp(np.cumsum(gen.normal(0, 0.03, n_days)))
+        spread = np.abs(gen.normal(0, 0.01, n_days)) * close
+        return pd.DataFrame({
+            'Close': close,
+            'High': close + spread,
+            'Low': close - spread,
+            'Open': np.roll(close, 1),
+            'Volume': gen.lognormal(15, 1, n_days)
+        }, index=index).iloc[1:]
+    
+    return source
+
+_fetch_lock = threading.Lock()
+# NEXUS_FAKE_SOURCE=1 remplace Yahoo Finance par la source simulée (tests de charge locaux)
+_source = make_fake_source(latency=0.05) if os.getenv("NEXUS_FAKE_SOURCE") else download_history
+# NEXUS_TRADES_DIR : barres construites depuis des fichiers de trades locaux (<TICKER>.parquet / .csv)
+if os.getenv("NEXUS_TRADES_DIR"):
+    _source = make_trade_source(
+        os.getenv("NEXUS_TRADES_DIR"),
+        os.getenv("NEXUS_BAR_TYPE", "time"),
+        os.getenv("NEXUS_BAR_SIZE", "1D")
+    )
+_inflight = {}
+# Génération de la source : invalide les données de repli après set_data_source
+_generation = 0
+_breaker = {"failures": 0, "opened_at": None}
+_fetch_stats = {"calls": 0, "coalesced": 0, "retries": 0, "fallbacks": 0, "rejected": 0}
+
+def set_data_source(source):
+    
+    global _source, _generation
+    with _fetch_lock:
+        _source = source
+        _generation += 1
+        _breaker.update(failures=0, opened_at=None)
+
+def _breaker_allows():
+    
+    with _fetch_lock:
+        opened_at = _breaker["opened_at"]
+        if opened_at is None:
+            return True
+        # Demi-ouverture : un essai est autorisé après la période de refroidissement
+        if time.time() - opened_at >= BREAKER_COOLDOWN:
+            _breaker["opened_at"] = time.time()
+            return True
+        _fetch_stats["rejected"] += 1
+        return False
+
+def _record_result(success):
+    
+    with _fetch_lock:
+        if success:
+            _breaker.update(failures=0, opened_at=None)
+        else:
+            _breaker["failures"] += 1
+            if _breaker["failures"] >= BREAKER_THRESHOLD:
+                _breaker["opened_at"] = time.time()
+
+def _fetch_with_retry(ticker, period):
+    
+    last_error = None
+    for attempt in range(MAX_RETRIES):
+        if not _breaker_allows():
+            raise CircuitOpenError("Source de données indisponible (circuit ouvert)")
+        try:
+            data = _source(ticker, period)
+            _record_result(True)
+            return data
+        except Exception as e:
+            last_error = e
+            _record_result(False)
+            if attempt < MAX_RETRIES - 1:
+                with _fetch_lock:
+                    _fetch_stats["retries"] += 1
+                time.sleep(RETRY_BASE_DELAY * 2 ** attempt * random.uniform(0.5, 1.5))
+    raise last_error
+
+def _last_good_key(ticker, period):
+    
+    # Dernières données valides dans le cache à budget mémoire : évincées comme les analyses
+    return ("last_good", _generation, ticker, period)
+
+def fetch_history(ticker, period="max", fallback=True):
+    
+    # Single-flight : les requêtes identiques simultanées partagent un seul téléchargement
+    key = (ticker, period)
+    with _fetch_lock:
+        _fetch_stats["calls"] += 1
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = {"event": threading.Event(), "result": None, "error": None}
+            _inflight[key] = call
+        else:
+            _fetch_stats["coalesced"] += 1
+    
+    if leader:
+        try:
+            result = _fetch_with_retry(ticker, period)
+            if result is not None and not result.empty:
+                # Date du téléchargement : version de la donnée, conservée si elle sert de repli
+                result.attrs["fetched_at"] = time.time()
+                analysis_cache.put(_last_good_key(ticker, period), result)
+            call["result"] = result
+        except Exception as e:
+            call["error"] = e
+        finally:
+            with _fetch_lock:
+                _inflight.pop(key, None)
+            call["event"].set()
+    else:
+        call["event"].wait()
+    
+    if call["error"] is None:
+        return call["result"]
+    
+    # Repli sur la dernière donnée valide si la source est en panne (fallback=False : l'appelant veut l'erreur)
+    last = analysis_cache.get(_last_good_key(ticker, period)) if fallback else None
+    with _fetch_lock:
+        if last is not None:
+            _fetch_stats["fallbacks"] += 1
+    if last is None:
+        raise call["error"]
+    return last
+
+def get_fetch_stats():
+    
+    with _fetch_lock:
+        stats = dict(_fetch_stats)
+        stats["breaker_open"] = _breaker["opened_at"] is not None
+        stats["consecutive_failures"] = _breaker["failures"]
+    return stats
+
 def get_financial_data(ticker):
     
     try:
-        data = yf.download(ticker, period="max", auto_adjust=True)
-        
-        if data is not None and not data.empty:
-            if isinstance(data.columns, pd.MultiIndex):
-                data.columns = data.columns.get_level_values(0)
-            data.columns = [str(col).capitalize() for col in data.columns]
-            return data.dropna()
+        return fetch_history(ticker)
     except Exception as e:
         st.error(f"Erreur lors du téléchargement de {ticker}: {e}")
     return None
+
+def get_price_matrix(tickers, period="1y"):
+    
+    # Matrice T×N des clôtures, alignée sur un calendrier commun ; les erreurs de la source
+    # sont propagées à l'appelant (screener, scanner de paires) qui les affiche
+    if _source is not download_history:
+        # Source remplacée (simulée, fichiers de trades) : une série par ticker, sources vides ou en erreur ignorées
+        columns = {}
+        last_error = None
+        for t in tickers:
+            try:
+                data = _source(t, period)
+            except Exception as e:
+                last_error = e
+                continue
+            if data is not None and not data.empty and 'Close' in data:
+                columns[t] = data['Close']
+        if not columns:
+            if last_error is not None:
+                raise last_error
+            return None
+        close = pd.DataFrame(columns)
+        return close.dropna(how='all').ffill(limit=3).dropna(axis=1, how='all')
+    
+    yf = lazy_import("yfinance")
+    data = yf.download(list(tickers), period=period, auto_adjust=True, progress=False, threads=True)
+    if data is None or data.empty:
+        return None
+    
+    if isinstance(data.columns, pd.MultiIndex):
+        close = data['Close']
+    else:
+        close = data[['Close']].rename(columns={'Close': tickers[0]})
+    close = close.dropna(how='all').ffill(limit=3)
+    return close.dropna(axis=1, how='all')
@@ -0,0 +1,217 @@
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from startup import lazy_import
+
+MODELS = {"GARCH(1,1)": "garch", "GJR-GARCH(1,1)": "gjr"}
+MAX_WORKERS = int(os.getenv("NEXUS_GARCH_WORKERS", str(os.cpu_count() or 2)))
+MIN_OBS = 100
+
+# Rendements en pourcentage : meilleur conditionnement numérique de l'optimisation
+SCALE = 100.0
+
+_lock = threading.Lock()
+_last_params = {}
+
+def _unpack(params, model):
+
+    if model == "gjr":
+        omega, alpha, gamma, beta = params
+    else:
+        omega, alpha, beta = params
+        gamma = 0.0
+    return omega, alpha, gamma, beta
+
+def _variance(params, eps, model, backcast):
+
+    # σ²_t = ω + (α + γ·1[ε_{t-1}<0]) ε²_{t-1} + β σ²_{t-1} : récursion linéaire en σ², filtrée en C (lfilter)
+    lfilter = lazy_import("scipy.signal").lfilter
+    omega, alpha, gamma, beta = _unpack(params, model)
+
+    eps2 = eps[:-1] ** 2
+    neg_eps2 = np.where(eps[:-1] < 0, eps2, 0.0)
+    drive = omega + alpha * eps2 + gamma * neg_eps2
+    sigma2 = np.empty(len(eps))
+    sigma2[0] = backcast
+    sigma2[1:] = lfilter([1.0], [1.0, -beta], drive, zi=[beta * backcast])[0]
+    return sigma2, eps2, neg_eps2
+
+def _objective(params, eps, model, backcast):
+
+    lfilter = lazy_import("scipy.signal").lfilter
+    beta = params[-1]
+    sigma2, eps2, neg_eps2 = _variance(params, eps, model, backcast)
+    sigma2 = np.maximum(sigma2, 1e-12)
+    n = len(eps)
+
+    # Log-vraisemblance gaussienne (négative, moyennée)
+    nll = 0.5 * np.mean(np.log(sigma2) + eps ** 2 / sigma2)
+
+    # Gradients analytiques : dσ²_t/dθ suit la même récursion (même filtre, une passe pour tous les paramètres)
+    drivers = [np.ones(n - 1), eps2]
+    if model == "gjr":
+        drivers.append(neg_eps2)
+    drivers.append(sigma2[:-1])
+    dsigma2 = np.zeros((len(drivers), n))
+    dsigma2[:, 1:] = lfilter([1.0], [1.0, -beta], np.vstack(drivers), axis=1)
+
+    weight = 0.5 * (1 / sigma2 - eps ** 2 / sigma2 ** 2) / n
+    return nll, dsigma2 @ weight
+
+def _default_start(eps, model):
+
+    var = eps.var()
+    if model == "gjr":
+        return np.array([var * 0.03, 0.03, 0.06, 0.91])
+    return np.array([var * 0.03, 0.06, 0.91])
+
+def fit_garch(returns, model="garch", x0=None):
+
+    optimize = lazy_import("scipy.optimize")
+    r = np.asarray(pd.Series(returns).dropna(), dtype=float) * SCALE
+    if len(r) < MIN_OBS:
+        raise ValueError(f"Au moins {MIN_OBS} rendements requis pour l'estimation GARCH")
+
+    mu = r.mean()
+    eps = r - mu
+    backcast = eps.var()
+
+    # Stationnarité : α + γ/2 + β < 1
+    weights = np.array([0.0, 1.0, 0.5, 1.0]) if model == "gjr" else np.array([0.0, 1.0, 1.0])
+    constraint = {'type': 'ineq', 'fun': lambda p: 0.9999 - weights @ p, 'jac': lambda p: -weights}
+    bounds = [(1e-8, None)] + [(0.0, 1.0)] * (len(weights) - 1)
+
+    start = _default_start(eps, model) if x0 is None else np.asarray(x0, dtype=float)
+    result = optimize.minimize(
+        _objective, start, args=(eps, model, backcast), jac=True,
+        method='SLSQP', bounds=bounds, constraints=[constraint],
+        options={'maxiter': 200, 'ftol': 1e-10}
+    )
+
+    params = result.x
+    sigma2, _, _ = _variance(params, eps, model, backcast)
+    omega, alpha, gamma, beta = _unpack(params, model)
+    persistence = alpha + gamma / 2 + beta
+    next_var = omega + (alpha + gamma * (eps[-1] < 0)) * eps[-1] ** 2 + beta * sigma2[-1]
+
+    index = pd.Series(returns).dropna().index
+    return {
+        'model': model,
+        'params': params,
+        'omega': omega / SCALE ** 2,
+        'alpha': alpha,
+        'gamma': gamma,
+        'beta': beta,
+        'mu': mu / SCALE,
+        'persistence': persistence,
+        'long_run_vol': np.sqrt(omega / (1 - persistence)) / SCALE if persistence < 1 else np.nan,
+        'conditional_vol': pd.Series(np.sqrt(sigma2) / SCALE, index=index),
+        'next_vol': np.sqrt(next_var) / SCALE,
+        'loglik': -result.fun * len(eps),
+        'iterations': result.nit,
+        'converged': bool(result.success),
+    }
+
+def filter_volatility(fit, returns):
+
+    # Volatilité conditionnelle sur de nouvelles données avec des paramètres figés (hors échantillon)
+    r = pd.Series(returns).dropna()
+    eps = r.to_numpy(dtype=float) * SCALE - fit['mu'] * SCALE
+    omega, alpha, gamma, beta = _unpack(fit['params'], fit['model'])
+    backcast = omega / (1 - fit['persistence']) if fit['persistence'] < 1 else eps.var()
+    sigma2, _, _ = _variance(fit['params'], eps, fit['model'], backcast)
+    next_var = omega + (alpha + gamma * (eps[-1] < 0)) * eps[-1] ** 2 + beta * sigma2[-1]
+    return dict(fit, conditional_vol=pd.Series(np.sqrt(sigma2) / SCALE, index=r.index), next_vol=np.sqrt(next_var) / SCALE)
+
+def forecast_volatility(fit, horizon=30):
+
+    # σ²_{T+h} = V + (α + γ/2 + β)^(h-1) (σ²_{T+1} - V), V = variance de long terme
+    persistence = fit['persistence']
+    steps = np.arange(horizon)
+    if persistence < 1:
+        long_var = fit['omega'] / (1 - persistence)
+        var = long_var + persistence ** steps * (fit['next_vol'] ** 2 - long_var)
+    else:
+        var = fit['next_vol'] ** 2 + fit['omega'] * steps
+    return np.sqrt(var)
+
+def fit_ticker(ticker, returns, model="garch"):
+
+    # Réestimation démarrée depuis les derniers paramètres du ticker (peu d'itérations)
+    with _lock:
+        x0 = _last_params.get((ticker, model))
+    fit = fit_garch(returns, model, x0)
+    with _lock:
+        _last_params[(ticker, model)] = fit['params']
+    return fit
+
+def _fit_worker(ticker, returns, model, x0):
+
+    try:
+        fit = fit_garch(returns, model, x0)
+    except Exception:
+        return ticker, None
+    fit.pop('conditional_vol')
+    return ticker, fit
+
+def fit_universe(prices, model="garch", workers=MAX_WORKERS):
+
+    # Une estimation par colonne de la matrice T×N, réparties sur un pool de processus
+    start = time.perf_counter()
+    returns = np.log(prices).diff()
+    with _lock:
+        starts = [_last_params.get((t, model)) for t in returns.columns]
+    jobs = [(t, returns[t].dropna(), model, x0) for t, x0 in zip(returns.columns, starts)]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            fits = list(pool.map(_fit_worker, *zip(*jobs)))
+    else:
+        fits = [_fit_worker(*job) for job in jobs]
+
+    rows = {}
+    with _lock:
+        for ticker, fit in fits:
+            if fit is None:
+                continue
+            _last_params[(ticker, model)] = fit['params']
+            rows[ticker] = {
+                'Vol_Prevue': fit['next_vol'] * np.sqrt(252),
+                'Vol_Long_Terme': fit['long_run_vol'] * np.sqrt(252),
+                'Persistance': fit['persistence'],
+                'Iterations': fit['iterations'],
+            }
+
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    return table, time.perf_counter() - start
+
+def volatility_bands(price, fit, horizon=30, z=1.96):
+
+    # Bandes en échantillon : σ_t est connue à la clôture t-1 (prévision à un pas)
+    vol = fit['conditional_vol'].reindex(price.index)
+    previous = price.shift(1)
+    history = pd.DataFrame({
+        'Vol_Haute': previous * np.exp(z * vol),
+        'Vol_Basse': previous * np.exp(-z * vol),
+    }, index=price.index)
+
+    # Cône de prévision : volatilité cumulée sur l'horizon
+    cumulative = np.sqrt(np.cumsum(forecast_volatility(fit, horizon) ** 2))
+    dates = pd.date_range(price.index[-1], periods=horizon + 1, freq='D')[1:]
+    last = price.iloc[-1]
+    cone = pd.DataFrame({
+        'Vol_Haute': last * np.exp(z * cumulative),
+        'Vol_Basse': last * np.exp(-z * cumulative),
+    }, index=dates)
+    return history, cone
+
+def volatility_target_sizes(fit, target_vol=0.4, max_leverage=1.0):
+
+    # Taille de position = vol cible / vol prévue (annualisées), plafonnée par le levier maximal
+    forecast = fit['conditional_vol'] * np.sqrt(252)
+    return (target_vol / forecast).clip(upper=max_leverage)
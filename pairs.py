@@ -0,0 +1,167 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MAX_WORKERS = int(os.getenv("NEXUS_PAIRS_WORKERS", str(os.cpu_count() or 2)))
+BATCH_SIZE = 2000
+MIN_OBS = 120
+
+# Valeurs critiques de MacKinnon (2010), test de cointégration à 2 variables avec constante :
+# c(T) = b∞ + b1/T + b2/T²
+_MACKINNON = {
+    0.01: (-3.89644, -10.9519, -22.527),
+    0.05: (-3.33613, -6.1101, -6.823),
+    0.10: (-3.04445, -4.2412, -2.720),
+}
+
+_worker_prices = None
+
+def critical_value(n_obs, level=0.05):
+
+    b_inf, b1, b2 = _MACKINNON[level]
+    return b_inf + b1 / n_obs + b2 / n_obs ** 2
+
+def prune_pairs(log_prices, min_corr=0.8):
+
+    # Élagage par la matrice de corrélation des rendements : seules les paires très corrélées sont testées
+    returns = np.diff(log_prices, axis=0)
+    corr = pd.DataFrame(returns).corr(min_periods=MIN_OBS).to_numpy()
+    i, j = np.triu_indices(corr.shape[0], k=1)
+    keep = corr[i, j] >= min_corr
+    return i[keep], j[keep], corr[i, j][keep]
+
+def _lagged_regression(dep, regressors, valid):
+
+    # Moindres carrés par lot : une régression par colonne, équations normales (B, p, p)
+    X = np.where(valid[..., None], np.stack(regressors, axis=-1), 0.0)
+    y = np.where(valid, dep, 0.0)
+    xtx = np.einsum('tbp,tbq->bpq', X, X)
+    xty = np.einsum('tbp,tb->bp', X, y)
+    n = valid.sum(axis=0)
+    p = len(regressors)
+
+    xtx_inv = np.linalg.pinv(xtx)
+    coef = np.einsum('bpq,bq->bp', xtx_inv, xty)
+    resid = y - np.einsum('tbp,bp->tb', X, coef)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s2 = (resid ** 2).sum(axis=0) / (n - p)
+        t_stat = coef[:, 0] / np.sqrt(s2 * xtx_inv[:, 0, 0])
+    return coef, t_stat
+
+def engle_granger_batch(y, x, lags=1):
+
+    # y, x : log-prix T×B (une colonne par paire), NaN hors historique commun
+    valid = ~(np.isnan(y) | np.isnan(x))
+    n = valid.sum(axis=0)
+    y0 = np.where(valid, y, 0.0)
+    x0 = np.where(valid, x, 0.0)
+
+    # Étape 1 : régression de cointégration y = α + βx
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_y = y0.sum(axis=0) / n
+        mean_x = x0.sum(axis=0) / n
+        dx = np.where(valid, x0 - mean_x, 0.0)
+        dy = np.where(valid, y0 - mean_y, 0.0)
+        beta = (dx * dy).sum(axis=0) / (dx ** 2).sum(axis=0)
+    alpha = mean_y - beta * mean_x
+    resid = np.where(valid, y0 - alpha - beta * x0, 0.0)
+
+    # Étape 2 : ADF sans constante sur les résidus, Δe_t = γ e_{t-1} + Σ φ_k Δe_{t-k}
+    de = resid[1:] - resid[:-1]
+    de_valid = valid[1:] & valid[:-1]
+    start = lags
+    regressors = [resid[start:-1]]
+    row_valid = de_valid[start:].copy()
+    for k in range(1, lags + 1):
+        regressors.append(de[start - k:len(de) - k])
+        row_valid &= de_valid[start - k:len(de_valid) - k]
+    _, t_stat = _lagged_regression(de[start:], regressors, row_valid)
+
+    # Demi-vie de retour à la moyenne : Δe_t = λ e_{t-1} (sans retards), demi-vie = -ln2 / λ
+    gamma, _ = _lagged_regression(de, [resid[:-1]], de_valid)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_life = np.where(gamma[:, 0] < 0, -np.log(2) / gamma[:, 0], np.inf)
+
+    return {'beta': beta, 'alpha': alpha, 't_stat': t_stat, 'half_life': half_life, 'n_obs': n}
+
+def _init_worker(log_prices):
+
+    global _worker_prices
+    _worker_prices = log_prices
+
+def _scan_batch(i, j, lags, prices=None):
+
+    # Matrice des log-prix transmise une fois par worker (initializer), seuls les indices circulent
+    prices = _worker_prices if prices is None else prices
+    return engle_granger_batch(prices[:, i], prices[:, j], lags)
+
+def scan_pairs(prices, min_corr=0.8, level=0.05, max_half_life=60, lags=1, workers=MAX_WORKERS, batch_size=BATCH_SIZE):
+
+    start = time.perf_counter()
+    prices = prices.loc[:, prices.notna().sum() >= MIN_OBS]
+    log_prices = np.log(prices.to_numpy(dtype=float))
+    i, j, corr = prune_pairs(log_prices, min_corr)
+
+    batches = [(i[k:k + batch_size], j[k:k + batch_size]) for k in range(0, len(i), batch_size)]
+    if len(batches) > 1 and workers > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches)), initializer=_init_worker, initargs=(log_prices,)) as pool:
+            results = list(pool.map(_scan_batch, *zip(*batches), [lags] * len(batches)))
+    else:
+        results = [_scan_batch(bi, bj, lags, log_prices) for bi, bj in batches]
+
+    columns = ['beta', 'alpha', 't_stat', 'half_life', 'n_obs']
+    merged = {c: np.concatenate([r[c] for r in results]) if results else np.array([]) for c in columns}
+    tickers = np.array([str(t).replace("-USD", "") for t in prices.columns])
+
+    scan = pd.DataFrame({
+        'Actif_Y': tickers[i],
+        'Actif_X': tickers[j],
+        'Correlation': corr,
+        'Beta': merged['beta'],
+        'Alpha': merged['alpha'],
+        'ADF_t': merged['t_stat'],
+        'Seuil_Critique': critical_value(np.maximum(merged['n_obs'], 1), level),
+        'Demi_Vie': merged['half_life'],
+        'Observations': merged['n_obs'],
+    })
+    scan['Cointegre'] = (scan['ADF_t'] < scan['Seuil_Critique']) & (scan['Observations'] >= MIN_OBS)
+
+    # Classement : paires cointégrées à retour rapide, statistique ADF la plus négative d'abord
+    ranked = scan[scan['Cointegre'] & (scan['Demi_Vie'] <= max_half_life)].sort_values('ADF_t').reset_index(drop=True)
+    stats = {
+        'assets': prices.shape[1],
+        'pairs_total': prices.shape[1] * (prices.shape[1] - 1) // 2,
+        'pairs_tested': len(i),
+        'pairs_selected': len(ranked),
+        'duration': time.perf_counter() - start,
+    }
+    return ranked, stats
+
+def spread_signal(spread, window=60, entry_z=2.0, exit_z=0.5):
+
+    # Z-score glissant du spread : long sous -entry_z, short au-dessus de +entry_z, sortie dans ±exit_z
+    mean = spread.rolling(window).mean()
+    std = spread.rolling(window).std()
+    z = (spread - mean) / std
+    state = np.where(z < -entry_z, 1.0, np.where(z > entry_z, -1.0, np.where(z.abs() < exit_z, 0.0, np.nan)))
+    return pd.Series(state, index=spread.index).ffill().fillna(0.0), z
+
+def backtest_pair(price_y, price_x, beta, initial_capital, transaction_fee=0.001, window=60, entry_z=2.0, exit_z=0.5):
+
+    from analytics import run_backtesting
+
+    frame = pd.concat([price_y, price_x], axis=1, keys=['Y', 'X']).dropna()
+    spread = np.log(frame['Y']) - beta * np.log(frame['X'])
+
+    # Portefeuille couvert (1 de Y contre β de X) normalisé en exposition brute : indice de prix synthétique
+    leg_returns = (frame['Y'].pct_change() - beta * frame['X'].pct_change()) / (1 + abs(beta))
+    data = pd.DataFrame({'Close': 100 * (1 + leg_returns.fillna(0)).cumprod()}, index=frame.index)
+
+    # β estimé sur tout l'échantillon du scan (in-sample)
+    signal, z = spread_signal(spread, window, entry_z, exit_z)
+    results = run_backtesting(data, initial_capital, "Pairs", transaction_fee, signal=signal)
+    results[0]['Z_Score'] = z
+    return results
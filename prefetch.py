@@ -0,0 +1,187 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from analytics import calculate_returns, add_technical_indicators
+from data_loader import fetch_history, get_financial_data
+
+DEFAULT_POPULAR = ["BTC", "ETH", "SOL", "XRP", "BNB", "ADA", "DOGE", "AVAX"]
+
+REFRESH_INTERVAL = int(os.getenv("NEXUS_PREFETCH_INTERVAL", "600"))
+MAX_WORKERS = int(os.getenv("NEXUS_PREFETCH_WORKERS", "4"))
+BACKOFF_BASE = 30
+BACKOFF_MAX = 1800
+
+_lock = threading.Lock()
+_entries = {}
+_stats = {"hits": 0, "misses": 0}
+
+def get_popular_tickers():
+
+    raw = os.getenv("NEXUS_PREFETCH_TICKERS")
+    symbols = raw.split(",") if raw else DEFAULT_POPULAR
+    return [f"{s.strip().upper()}-USD" for s in symbols if s.strip()]
+
+def build_analysis_frame(data):
+
+    # Indicateurs calculés une fois sur tout l'historique, puis découpés à la demande
+    return add_technical_indicators(calculate_returns(data))
+
+def _jitter(delay, spread):
+
+    return delay * random.uniform(1 - spread, 1 + spread)
+
+def _store(ticker, data, scheduled=False):
+
+    frame = build_analysis_frame(data)
+    now = time.time()
+    # Version des données = date du téléchargement : change à chaque rafraîchissement réussi,
+    # reste celle d'origine pour une donnée de repli (âge réel, clés de cache inchangées)
+    updated_at = data.attrs.get("fetched_at", now)
+    frame.attrs["updated_at"] = updated_at
+    with _lock:
+        entry = _entries.setdefault(ticker, {"failures": 0, "scheduled": scheduled})
+        entry.update(
+            data=data,
+            frame=frame,
+            updated_at=updated_at,
+            next_refresh=now + _jitter(REFRESH_INTERVAL, 0.1)
+        )
+        entry["scheduled"] = entry["scheduled"] or scheduled
+    return frame
+
+def warm_ticker(ticker):
+
+    try:
+        # Sans repli : une panne de la source est un échec (backoff), pas un rafraîchissement
+        data = fetch_history(ticker, fallback=False)
+        if data is None or data.empty:
+            raise ValueError("aucune donnée reçue")
+        _store(ticker, data, scheduled=True)
+        with _lock:
+            _entries[ticker].update(failures=0, last_error=None)
+        return True
+    except Exception as e:
+        with _lock:
+            entry = _entries.setdefault(ticker, {"failures": 0, "scheduled": True})
+            entry["failures"] += 1
+            entry["last_error"] = str(e)
+            # Backoff exponentiel avec jitter pour ne pas marteler la source
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (entry["failures"] - 1))
+            entry["next_refresh"] = time.time() + _jitter(delay, 0.5)
+        return False
+
+def _due_tickers(tickers):
+
+    now = time.time()
+    with _lock:
+        return [t for t in tickers if _entries.get(t, {}).get("next_refresh", 0) <= now]
+
+def _scheduler_loop(tickers, tick):
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="nexus-prefetch") as pool:
+        while True:
+            due = _due_tickers(tickers)
+            if due:
+                list(pool.map(warm_ticker, due))
+            time.sleep(tick)
+
+def start_prefetcher(tickers=None, tick=5):
+
+    tickers = tickers or get_popular_tickers()
+    thread = threading.Thread(target=_scheduler_loop, args=(tickers, tick), name="nexus-prefetcher", daemon=True)
+    thread.start()
+    return thread
+
+def _fresh_entry(ticker):
+
+    entry = _entries.get(ticker)
+    if entry is None or "frame" not in entry:
+        return None
+    # Les tickers planifiés sont rafraîchis par le scheduler ; les autres expirent
+    if entry["scheduled"] or time.time() - entry["updated_at"] <= REFRESH_INTERVAL:
+        return entry
+    return None
+
+def _drop_expired():
+
+    # Tickers non planifiés expirés : libérés, la mémoire des analyses reste bornée par analysis_cache
+    now = time.time()
+    expired = [
+        ticker for ticker, entry in _entries.items()
+        if not entry["scheduled"] and now - entry.get("updated_at", now) > REFRESH_INTERVAL
+    ]
+    for ticker in expired:
+        del _entries[ticker]
+
+def _cached_frame(ticker):
+
+    with _lock:
+        entry = _fresh_entry(ticker)
+        if entry is not None:
+            _stats["hits"] += 1
+            return entry["frame"]
+        _stats["misses"] += 1
+        _drop_expired()
+    return None
+
+def load_analysis_frame(ticker):
+
+    # Sans interface : les erreurs de la source sont propagées à l'appelant (API)
+    frame = _cached_frame(ticker)
+    if frame is not None:
+        return frame
+    data = fetch_history(ticker)
+    if data is None or data.empty:
+        return None
+    return _store(ticker, data)
+
+def get_analysis_frame(ticker):
+
+    frame = _cached_frame(ticker)
+    if frame is not None:
+        return frame
+    data = get_financial_data(ticker)
+    if data is None or data.empty:
+        return None
+    return _store(ticker, data)
+
+def get_quote(ticker):
+
+    with _lock:
+        entry = _fresh_entry(ticker)
+        if entry is None or len(entry["data"]) < 2:
+            return None
+        close = entry["data"]["Close"]
+
+    current_price = close.iloc[-1]
+    prev_close = close.iloc[-2]
+    return current_price, ((current_price - prev_close) / prev_close) * 100
+
+def get_prefetch_stats():
+
+    now = time.time()
+    with _lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+        rows = [
+            {
+                "Ticker": ticker,
+                "Planifié": entry["scheduled"],
+                "Âge (s)": round(now - entry["updated_at"]) if "updated_at" in entry else None,
+                "Échecs": entry["failures"],
+                "Dernière Erreur": entry.get("last_error"),
+            }
+            for ticker, entry in _entries.items()
+        ]
+
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": hits / total if total else 0.0,
+        "entries": pd.DataFrame(rows),
+    }
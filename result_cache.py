@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_BUDGET_MB = int(os.getenv("NEXUS_CACHE_MAX_MB", "512"))
+DEFAULT_POLICY = os.getenv("NEXUS_CACHE_POLICY", "lru")
+
+def estimate_size(obj):
+
+    # Taille approximative en octets des objets mis en cache
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if hasattr(obj, "to_plotly_json"):
+        return estimate_size(obj.to_plotly_json())
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        if len(obj) > 1000 and all(isinstance(x, (int, float)) for x in obj[:10]):
+            return sys.getsizeof(obj) + len(obj) * 24
+        return sys.getsizeof(obj) + sum(estimate_size(x) for x in obj)
+    return sys.getsizeof(obj)
+
+class ResultCache:
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET_MB * 1024 ** 2, policy=DEFAULT_POLICY):
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            entry["count"] += 1
+            self._entries.move_to_end(key)
+            return entry["value"]
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return value
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes_used -= old["size"]
+            self._entries[key] = {"value": value, "size": size, "count": 1}
+            self.bytes_used += size
+            self._evict()
+        return value
+
+    def get_or_compute(self, key, compute):
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+
+    def _evict(self):
+        while self.bytes_used > self.max_bytes and self._entries:
+            if self.policy == "lfu":
+                # Moins fréquemment utilisé ; à égalité, le plus ancien (ordre LRU)
+                victim = min(self._entries, key=lambda k: self._entries[k]["count"])
+            else:
+                victim = next(iter(self._entries))
+            self.bytes_used -= self._entries.pop(victim)["size"]
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+            }
+
+# Cache partagé par toutes les sessions du processus serveur
+analysis_cache = ResultCache()
@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from startup import lazy_import
+
+CONFIDENCE_LEVELS = (0.95, 0.99)
+ROLLING_CHUNK_ELEMENTS = 5_000_000
+
+def _as_matrix(returns):
+
+    if isinstance(returns, pd.Series):
+        return returns.to_frame(returns.name or 'Rendements')
+    return returns
+
+def _normal_quantile(p):
+
+    return lazy_import("scipy.special").ndtri(p)
+
+def _normal_pdf(z):
+
+    return np.exp(-0.5 * z ** 2) / np.sqrt(2 * np.pi)
+
+def _cornish_fisher_z(z, skew, kurt):
+
+    # Quantile normal corrigé de l'asymétrie et de l'excès de kurtosis
+    return (z
+            + (z ** 2 - 1) * skew / 6
+            + (z ** 3 - 3 * z) * kurt / 24
+            - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+
+def historical_var(returns, levels=CONFIDENCE_LEVELS):
+
+    # Quantiles de toutes les colonnes en un appel (sélection partielle, pas de tri complet)
+    R = _as_matrix(returns)
+    values = R.to_numpy(dtype=float)
+    alphas = 1 - np.asarray(levels)
+    q = np.nanquantile(values, alphas, axis=0)
+
+    var = -q
+    cvar = np.empty_like(var)
+    for i in range(len(alphas)):
+        tail = np.where(values <= q[i], values, np.nan)
+        cvar[i] = -np.nanmean(tail, axis=0)
+    return var, cvar
+
+def parametric_var(returns, levels=CONFIDENCE_LEVELS, cornish_fisher=False):
+
+    R = _as_matrix(returns)
+    mu = R.mean().to_numpy()
+    sigma = R.std().to_numpy()
+    alphas = 1 - np.asarray(levels)
+    z = _normal_quantile(alphas)[:, None]
+
+    if not cornish_fisher:
+        var = -(mu + sigma * z)
+        cvar = -(mu - sigma * _normal_pdf(z) / alphas[:, None])
+        return var, cvar
+
+    skew = R.skew().to_numpy()
+    kurt = R.kurt().to_numpy()
+    var = -(mu + sigma * _cornish_fisher_z(z, skew, kurt))
+
+    # CVaR Cornish-Fisher : moyenne des quantiles corrigés sur la queue (intégration numérique)
+    cvar = np.empty_like(var)
+    for i, alpha in enumerate(alphas):
+        grid = alpha * (np.arange(1, 101) - 0.5) / 100
+        z_tail = _cornish_fisher_z(_normal_quantile(grid)[:, None], skew, kurt)
+        cvar[i] = -(mu + sigma * z_tail.mean(axis=0))
+    return var, cvar
+
+def compute_var_table(returns, levels=CONFIDENCE_LEVELS):
+
+    R = _as_matrix(returns)
+    methods = {
+        'Historique': historical_var(R, levels),
+        'Paramétrique': parametric_var(R, levels),
+        'Cornish-Fisher': parametric_var(R, levels, cornish_fisher=True),
+    }
+
+    table = {}
+    for method, (var, cvar) in methods.items():
+        for i, level in enumerate(levels):
+            table[f"VaR {method} {level:.0%}"] = var[i]
+            table[f"CVaR {method} {level:.0%}"] = cvar[i]
+    return pd.DataFrame(table, index=R.columns)
+
+def rolling_historical_var(returns, window=250, level=0.95):
+
+    # Fenêtres glissantes traitées par blocs : mémoire bornée, calcul vectorisé
+    R = _as_matrix(returns)
+    values = R.to_numpy(dtype=float)
+    T, N = values.shape
+    var = np.full((T, N), np.nan)
+    cvar = np.full((T, N), np.nan)
+    if T < window:
+        return pd.DataFrame(var, index=R.index, columns=R.columns), pd.DataFrame(cvar, index=R.index, columns=R.columns)
+
+    # Même définition que historical_var (quantile à interpolation linéaire) via une sélection partielle
+    position = (window - 1) * (1 - level)
+    lo = int(np.floor(position))
+    hi = min(lo + 1, window - 1)
+    frac = position - lo
+
+    windows = sliding_window_view(values, window, axis=0)
+    chunk = max(1, ROLLING_CHUNK_ELEMENTS // (window * N))
+
+    for start in range(0, len(windows), chunk):
+        block = np.partition(windows[start:start + chunk], hi, axis=-1)
+        upper = block[..., hi]
+        lower = block[..., :hi].max(axis=-1) if hi > lo else upper
+        q = lower + frac * (upper - lower)
+
+        # CVaR : moyenne des rendements <= VaR ; les lo+1 premiers suffisent sauf ex aequo avec la VaR
+        tail_sum = block[..., :lo + 1].sum(axis=-1)
+        tail_count = np.full(q.shape, lo + 1.0)
+        ties = upper <= q
+        if ties.any():
+            rest = block[ties][..., lo + 1:]
+            mask = rest <= q[ties][..., None]
+            tail_sum[ties] += (rest * mask).sum(axis=-1)
+            tail_count[ties] += mask.sum(axis=-1)
+
+        rows = slice(window - 1 + start, window - 1 + start + len(block))
+        var[rows] = -q
+        cvar[rows] = -tail_sum / tail_count
+
+    # Fenêtres incomplètes (valeurs manquantes) exclues
+    incomplete = (R.notna().rolling(window).sum() < window).to_numpy()
+    var[incomplete] = np.nan
+    cvar[incomplete] = np.nan
+
+    return pd.DataFrame(var, index=R.index, columns=R.columns), pd.DataFrame(cvar, index=R.index, columns=R.columns)
+
+def rolling_parametric_var(returns, window=250, level=0.95, cornish_fisher=False):
+
+    # Moments glissants, puis mêmes formules que parametric_var (VaR et CVaR)
+    R = _as_matrix(returns)
+    rolling = R.rolling(window)
+    mu = rolling.mean()
+    sigma = rolling.std()
+    alpha = 1 - level
+    z = _normal_quantile(alpha)
+
+    if not cornish_fisher:
+        var = -(mu + sigma * z)
+        cvar = -(mu - sigma * _normal_pdf(z) / alpha)
+        return var, cvar
+
+    skew = rolling.skew()
+    kurt = rolling.kurt()
+    var = -(mu + sigma * _cornish_fisher_z(z, skew, kurt))
+
+    grid = alpha * (np.arange(1, 101) - 0.5) / 100
+    z_tail = sum(_cornish_fisher_z(z_g, skew, kurt) for z_g in _normal_quantile(grid)) / len(grid)
+    cvar = -(mu + sigma * z_tail)
+    return var, cvar
+
+ROLLING_METHODS = {
+    'Historique': rolling_historical_var,
+    'Paramétrique': rolling_parametric_var,
+    'Cornish-Fisher': lambda returns, window, level: rolling_parametric_var(returns, window, level, cornish_fisher=True),
+}
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+ROLLING_WINDOWS = (30, 90, 365)
+
+def _window_sum(values, window):
+
+    # Somme glissante par différence de sommes cumulées : O(n) quelle que soit la fenêtre
+    csum = np.concatenate([[0.0], np.cumsum(values)])
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        out[window - 1:] = csum[window:] - csum[:-window]
+    return out
+
+def rolling_max_drawdown(equity, window):
+
+    # Agrégat associatif (pic, creux, mdd) par blocs de taille w : préfixes et suffixes cumulés par bloc,
+    # chaque fenêtre = suffixe d'un bloc + préfixe du suivant -> O(n) au total, quelle que soit la fenêtre
+    values = equity.to_numpy(dtype=float)
+    n = len(values)
+    out = np.full(n, np.nan)
+    if n < window:
+        return pd.Series(out, index=equity.index)
+
+    blocks = -(-n // window)
+    padded = np.pad(values, (0, blocks * window - n), mode='edge').reshape(blocks, window)
+
+    # Préfixe [début du bloc, j] : pic = cummax, mdd = max cumulé des baisses depuis le pic
+    prefix_peak = np.maximum.accumulate(padded, axis=1)
+    prefix_trough = np.minimum.accumulate(padded, axis=1)
+    prefix_mdd = np.maximum.accumulate(1 - padded / prefix_peak, axis=1)
+
+    # Suffixe [i, fin du bloc] : creux = cummin inversé, mdd = max des baisses de x_k vers le creux qui suit
+    reverse = padded[:, ::-1]
+    suffix_trough = np.minimum.accumulate(reverse, axis=1)
+    suffix_peak = np.maximum.accumulate(reverse, axis=1)[:, ::-1].ravel()
+    suffix_mdd = np.maximum.accumulate(1 - suffix_trough / reverse, axis=1)[:, ::-1].ravel()
+
+    # Fenêtre [i, i+w-1] : (M1, m1, d1) ⊕ (M2, m2, d2) = (max, min, max(d1, d2, 1 - m2/M1))
+    starts = np.arange(n - window + 1)
+    stops = starts + window - 1
+    combined = np.maximum.reduce([
+        suffix_mdd[starts],
+        prefix_mdd.ravel()[stops],
+        1 - prefix_trough.ravel()[stops] / suffix_peak[starts],
+    ])
+    # Fenêtre alignée sur un bloc : le suffixe couvre toute la fenêtre
+    out[window - 1:] = np.where(starts % window == 0, suffix_mdd[starts], combined)
+    return pd.Series(out, index=equity.index)
+
+def compute_rolling_metrics(df, windows=ROLLING_WINDOWS):
+
+    returns = df['Strategy_Returns'].fillna(0).to_numpy(dtype=float)
+    downside = np.minimum(returns, 0)
+
+    # Sommes cumulées calculées une seule fois et réutilisées pour toutes les fenêtres
+    sums = {
+        'r': returns,
+        'r2': returns ** 2,
+        'down2': downside ** 2,
+        'gains': np.maximum(returns, 0),
+        'losses': -downside,
+        'wins': (returns > 0).astype(float),
+        'active': (returns != 0).astype(float),
+    }
+
+    metrics = {}
+    for w in windows:
+        s = {name: _window_sum(values, w) for name, values in sums.items()}
+        mean = s['r'] / w
+        var = np.maximum(s['r2'] / w - mean ** 2, 0) * w / (w - 1)
+        downside_dev = np.sqrt(s['down2'] / w)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            metrics[f'Sharpe_{w}'] = np.where(var > 0, mean / np.sqrt(var), np.nan) * np.sqrt(252)
+            metrics[f'Sortino_{w}'] = np.where(downside_dev > 0, mean / downside_dev, np.nan) * np.sqrt(252)
+            metrics[f'WinRate_{w}'] = np.where(s['active'] > 0, s['wins'] / s['active'], np.nan)
+            metrics[f'ProfitFactor_{w}'] = np.where(s['losses'] > 0, s['gains'] / s['losses'], np.nan)
+
+        metrics[f'MaxDD_{w}'] = rolling_max_drawdown(df['Equity_Curve'], w).to_numpy()
+
+    return pd.DataFrame(metrics, index=df.index)
+
+def compare_strategies(data, initial_capital, strategies, transaction_fee=0.001, cost_models=None, window=90):
+
+    # Sharpe glissant de plusieurs stratégies sur les mêmes données (comparaison de régimes)
+    from analytics import run_backtesting
+
+    sharpe = {}
+    for name in strategies:
+        bt = run_backtesting(data, initial_capital, name, transaction_fee, cost_models)[0]
+        sharpe[name] = compute_rolling_metrics(bt, (window,))[f'Sharpe_{window}']
+    return pd.DataFrame(sharpe, index=data.index)
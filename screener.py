@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics import compute_indicators
+from data_loader import get_price_matrix
+from garch import fit_universe
+
+DEFAULT_UNIVERSE = [
+    "BTC", "ETH", "SOL", "XRP", "BNB", "ADA", "DOGE", "TRX", "AVAX", "DOT",
+    "LINK", "MATIC", "LTC", "BCH", "XLM", "ATOM", "ETC", "FIL", "NEAR", "APT",
+    "ARB", "OP", "ICP", "HBAR", "VET", "ALGO", "AAVE", "UNI", "MKR", "SAND",
+    "MANA", "AXS", "EGLD", "XTZ", "THETA", "EOS", "FTM", "FLOW", "CHZ", "GRT",
+]
+
+SCREENS = {
+    "RSI < 30 (Survendu)": "RSI_Survendu",
+    "RSI > 70 (Suracheté)": "RSI_Surachete",
+    "SMA20 croise SMA50 à la hausse": "Croisement_Haussier",
+    "SMA20 croise SMA50 à la baisse": "Croisement_Baissier",
+    "Prix hors Bandes de Bollinger": "Hors_Bollinger",
+}
+
+REFRESH_INTERVAL = int(os.getenv("NEXUS_SCREENER_INTERVAL", "900"))
+
+_lock = threading.Lock()
+_state = {"results": None, "updated_at": None, "duration": None, "last_error": None}
+
+def get_universe():
+
+    raw = os.getenv("NEXUS_SCREENER_UNIVERSE")
+    symbols = raw.split(",") if raw else DEFAULT_UNIVERSE
+    return [f"{s.strip().upper()}-USD" for s in symbols if s.strip()]
+
+def run_screen(prices):
+
+    # Un seul calcul colonne par colonne sur la matrice T×N (pas de boucle par ticker)
+    ind = compute_indicators(prices)
+
+    last = prices.iloc[-1]
+    sma_20, sma_50 = ind['SMA_20'], ind['SMA_50']
+    above_now = (sma_20.iloc[-1] > sma_50.iloc[-1]).to_numpy()
+    above_prev = (sma_20.iloc[-2] > sma_50.iloc[-2]).to_numpy() if len(prices) > 1 else above_now
+
+    results = pd.DataFrame({
+        'Prix': last,
+        'Variation_1J': prices.pct_change(fill_method=None).iloc[-1],
+        'RSI': ind['RSI'].iloc[-1],
+        'SMA_20': sma_20.iloc[-1],
+        'SMA_50': sma_50.iloc[-1],
+        'BB_Upper': ind['BB_Upper'].iloc[-1],
+        'BB_Lower': ind['BB_Lower'].iloc[-1],
+        'MACD_Histogram': ind['MACD_Histogram'].iloc[-1],
+    })
+
+    results['RSI_Survendu'] = results['RSI'] < 30
+    results['RSI_Surachete'] = results['RSI'] > 70
+    results['Croisement_Haussier'] = above_now & ~above_prev
+    results['Croisement_Baissier'] = ~above_now & above_prev
+    results['Hors_Bollinger'] = (last > results['BB_Upper']) | (last < results['BB_Lower'])
+
+    results.index = [str(t).replace("-USD", "") for t in results.index]
+    results.index.name = 'Ticker'
+    return results.dropna(subset=['Prix'])
+
+def filter_screen(results, screens):
+
+    if results is None or not screens:
+        return results
+
+    mask = np.ones(len(results), dtype=bool)
+    for label in screens:
+        mask &= results[SCREENS[label]].to_numpy()
+    return results[mask]
+
+def _record_error(message):
+
+    with _lock:
+        _state['last_error'] = f"{pd.Timestamp.now():%H:%M:%S} — {message}"
+
+def refresh_screen(tickers=None):
+
+    prices = get_price_matrix(tickers or get_universe())
+    if prices is None or prices.empty:
+        _record_error("aucune donnée de prix reçue")
+        return None
+
+    # Durée affichée : le screen seul (données déjà en mémoire), hors téléchargement et GARCH
+    start = time.perf_counter()
+    results = run_screen(prices)
+    duration = time.perf_counter() - start
+
+    # Volatilité GARCH prévue : réestimation démarrée depuis les paramètres du rafraîchissement précédent
+    # (séquentielle : exécutée dans un fil d'arrière-plan, pas de fork du serveur)
+    vol, _ = fit_universe(prices, workers=1)
+    if not vol.empty:
+        vol.index = [str(t).replace("-USD", "") for t in vol.index]
+        results['Vol_GARCH'] = vol['Vol_Prevue']
+
+    with _lock:
+        _state['results'] = results
+        _state['updated_at'] = pd.Timestamp.now()
+        _state['duration'] = duration
+        _state['last_error'] = None
+    return results
+
+def get_screen_results():
+
+    with _lock:
+        return _state['results'], _state['updated_at'], _state['duration'], _state['last_error']
+
+def _refresh_loop(interval):
+
+    while True:
+        try:
+            refresh_screen()
+        except Exception as e:
+            _record_error(str(e) or type(e).__name__)
+        time.sleep(interval)
+
+def start_background_screener(interval=REFRESH_INTERVAL):
+
+    thread = threading.Thread(target=_refresh_loop, args=(interval,), name="nexus-screener", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,130 @@
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+def _process_start_time():
+
+    # Date de création du processus (Linux) : inclut le démarrage de l'interpréteur et du serveur
+    try:
+        with open("/proc/self/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return time.time() - (uptime - started)
+    except (OSError, ValueError, IndexError):
+        return time.time()
+
+PROCESS_START = _process_start_time()
+COLD_START_TARGET = float(os.getenv("NEXUS_COLD_START_TARGET", "3.0"))
+
+# Ordre de mesure : streamlit importe lui-même plotly.graph_objects, Plotly est donc mesuré
+# avant lui (coût réel, inévitable) au lieu d'apparaître à 0 s après streamlit
+HEAVY_MODULES = [
+    "numpy",
+    "pandas",
+    "plotly.graph_objects",
+    "plotly.subplots",
+    "streamlit",
+    "yfinance",
+    "scipy.stats",
+]
+
+_import_times = {}
+_marks = {}
+
+def lazy_import(name):
+
+    # Import différé : le coût n'est payé qu'à la première utilisation, puis mesuré
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    _import_times[name] = time.perf_counter() - start
+    return module
+
+def mark(label):
+
+    # Seule la première occurrence compte (ex: premier rendu après démarrage)
+    _marks.setdefault(label, time.time() - PROCESS_START)
+
+def get_startup_report():
+
+    return {
+        "imports": dict(_import_times),
+        "marks": dict(_marks),
+        "target": COLD_START_TARGET,
+    }
+
+def measure_cold_imports(modules=HEAVY_MODULES):
+
+    # Un seul interpréteur neuf importe tout, dans l'ordre : chaque durée est incrémentale
+    # (pandas n'inclut pas numpy déjà chargé) et le total inclut le démarrage de l'interpréteur
+    code = (
+        "import json, time; timings = {}\n"
+        f"for name in {list(modules)!r}:\n"
+        "    t = time.perf_counter()\n"
+        "    try:\n"
+        "        __import__(name)\n"
+        "        timings[name] = time.perf_counter() - t\n"
+        "    except Exception:\n"
+        "        timings[name] = None\n"
+        "print(json.dumps(timings))"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    total = time.perf_counter() - start
+    if result.returncode != 0:
+        return {name: None for name in modules}, total
+    return json.loads(result.stdout.strip().splitlines()[-1]), total
+
+def prewarm(tickers=None):
+
+    # Worker préchauffé : imports lourds et cache des cryptos populaires avant tout trafic
+    for name in HEAVY_MODULES:
+        lazy_import(name)
+
+    from concurrent.futures import ThreadPoolExecutor
+    from prefetch import MAX_WORKERS, get_popular_tickers, warm_ticker
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        list(pool.map(warm_ticker, tickers or get_popular_tickers()))
+
+    mark("prechauffage")
+
+def main():
+
+    # Le module lancé en script est partagé avec app.py (mêmes mesures et marques)
+    sys.modules.setdefault("startup", sys.modules[__name__])
+
+    parser = argparse.ArgumentParser(description="Démarrage optimisé de Nexus Crypto Finance Pro")
+    parser.add_argument("--report", action="store_true", help="Mesurer le coût à froid des imports lourds")
+    parser.add_argument("--no-prewarm", action="store_true", help="Lancer le serveur sans préchauffage")
+    args, streamlit_args = parser.parse_known_args()
+
+    if args.report:
+        timings, total = measure_cold_imports()
+        for name, duration in timings.items():
+            print(f"{name:<25} {'échec' if duration is None else f'{duration:.3f}s'}")
+        status = "OK" if total <= COLD_START_TARGET else "AU-DESSUS"
+        print(f"{'total':<25} {total:.3f}s (objectif {COLD_START_TARGET:.1f}s : {status})")
+        return
+
+    if not args.no_prewarm:
+        prewarm()
+        print(f"Préchauffage terminé en {_marks['prechauffage']:.2f}s")
+
+    # Même processus : les modules et caches préchauffés sont réutilisés par le serveur
+    from streamlit.web import cli as stcli
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    sys.argv = ["streamlit", "run", app_path] + streamlit_args
+    sys.exit(stcli.main())
+
+if __name__ == "__main__":
+    main()
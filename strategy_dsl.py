@@ -0,0 +1,300 @@
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Mini-langage de règles, ex: "sma(close,20) > sma(close,50) and rsi(close,14) < 60"
+# Les expressions sont analysées une fois, les sous-expressions identiques partagées
+# (nœuds = tuples, donc égaux structurellement) et évaluées sur des tableaux NumPy entiers.
+
+STRATEGIES = {
+    "SMA Crossover (Trend)": {
+        "entry": "sma(close, 20) > sma(close, 50)",
+        "exit": None,
+        "description": ["- 🟢 **Achat** : SMA(20) > SMA(50)", "- 🔴 **Vente** : SMA(20) < SMA(50)"],
+    },
+    "RSI Mean Reversion": {
+        "entry": "rsi(close, 14) < 30",
+        "exit": None,
+        "description": ["- 🟢 **Achat** : RSI < 30 (Survendu)", "- 🔴 **Vente** : RSI > 70 (Suracheté)"],
+    },
+    "Buy & Hold": {
+        "entry": "1",
+        "exit": None,
+        "description": ["- 🟢 **Achat** : Début de période", "- 🔴 **Vente** : Fin de période"],
+    },
+}
+
+VARIABLES = ("close", "open", "high", "low", "volume")
+
+_TOKEN = re.compile(r"\s*(?:(\d+\.?\d*|\.\d+)|([A-Za-z_]\w*)|(<=|>=|==|!=|[-+*/(),<>]))")
+
+# "not" a son propre niveau (entre "and" et les comparaisons), comme en Python
+_BINARY_PRECEDENCE = [
+    ("or",),
+    ("and",),
+    ("not",),
+    ("<", "<=", ">", ">=", "==", "!="),
+    ("+", "-"),
+    ("*", "/"),
+]
+
+def _tokenize(text):
+
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None or match.end() == pos:
+            raise ValueError(f"Caractère inattendu à la position {pos}: '{text[pos:]}'")
+        number, name, op = match.groups()
+        if number is not None:
+            tokens.append(("num", float(number)))
+        elif name is not None:
+            tokens.append(("name", name.lower()))
+        else:
+            tokens.append(("op", op))
+        pos = match.end()
+    return tokens
+
+class _Parser:
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, value=None):
+        token = self.peek()
+        if token[0] is None:
+            raise ValueError("Fin d'expression inattendue")
+        if value is not None and token[1] != value:
+            raise ValueError(f"Attendu '{value}', trouvé '{token[1]}'")
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.binary(0)
+        if self.pos != len(self.tokens):
+            raise ValueError(f"Symbole inattendu: '{self.peek()[1]}'")
+        return node
+
+    def binary(self, level):
+        if level == len(_BINARY_PRECEDENCE):
+            return self.unary()
+        if _BINARY_PRECEDENCE[level] == ("not",):
+            if self.peek()[1] == "not":
+                self.take()
+                return ("not", self.binary(level))
+            return self.binary(level + 1)
+        node = self.binary(level + 1)
+        while self.peek()[1] in _BINARY_PRECEDENCE[level]:
+            op = self.take()[1]
+            node = ("bin", op, node, self.binary(level + 1))
+        return node
+
+    def unary(self):
+        kind, value = self.peek()
+        if value == "-":
+            self.take()
+            return ("neg", self.unary())
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "num":
+            return ("num", value)
+        if kind == "op" and value == "(":
+            node = self.binary(0)
+            self.take(")")
+            return node
+        if kind == "name":
+            if self.peek()[1] == "(":
+                self.take("(")
+                args = []
+                if self.peek()[1] != ")":
+                    args.append(self.binary(0))
+                    while self.peek()[1] == ",":
+                        self.take(",")
+                        args.append(self.binary(0))
+                self.take(")")
+                return _check_call(value, tuple(args))
+            if value in VARIABLES:
+                return ("var", value)
+            if value in ("true", "false"):
+                return ("num", 1.0 if value == "true" else 0.0)
+        raise ValueError(f"Symbole inconnu: '{value}'")
+
+def _window(arg, name):
+
+    if arg[0] != "num" or arg[1] < 1 or arg[1] != int(arg[1]):
+        raise ValueError(f"{name}() attend une période entière positive constante")
+    return int(arg[1])
+
+# Fonctions : nom -> (arité, indices des paramètres de période)
+FUNCTIONS = {
+    "sma": (2, (1,)),
+    "ema": (2, (1,)),
+    "std": (2, (1,)),
+    "rsi": (2, (1,)),
+    "highest": (2, (1,)),
+    "lowest": (2, (1,)),
+    "lag": (2, (1,)),
+    "bb_upper": (2, (1,)),
+    "bb_lower": (2, (1,)),
+    "cross_above": (2, ()),
+    "cross_below": (2, ()),
+    "abs": (1, ()),
+}
+
+def _check_call(name, args):
+
+    if name not in FUNCTIONS:
+        raise ValueError(f"Fonction inconnue: '{name}'")
+    arity, windows = FUNCTIONS[name]
+    if len(args) != arity:
+        raise ValueError(f"{name}() attend {arity} argument(s)")
+    for i in windows:
+        _window(args[i], name)
+    return ("call", name, args)
+
+@lru_cache(maxsize=1024)
+def compile_rule(text):
+
+    # Analyse unique par expression (mise en cache)
+    return _Parser(_tokenize(text)).parse()
+
+def _rolling(values, window):
+
+    return pd.Series(values).rolling(window=window)
+
+def _rsi(values, window):
+
+    # Même formule que analytics.compute_indicators
+    delta = pd.Series(values).diff()
+    gain = delta.where(delta > 0, 0).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    return (100 - (100 / (1 + gain / loss))).to_numpy()
+
+def _call(name, args, raw_args):
+
+    x = args[0]
+    if name == "abs":
+        return np.abs(x)
+    if name in ("cross_above", "cross_below"):
+        a, b = args
+        above = a > b
+        prev = np.concatenate([[False], above[:-1]])
+        valid = np.concatenate([[False], ~(np.isnan(a[:-1]) | np.isnan(b[:-1]))])
+        if name == "cross_above":
+            return above & ~prev & valid
+        below = a < b
+        prev_below = np.concatenate([[False], below[:-1]])
+        return below & ~prev_below & valid
+
+    n = int(raw_args[1][1])
+    if name == "sma":
+        return _rolling(x, n).mean().to_numpy()
+    if name == "ema":
+        return pd.Series(x).ewm(span=n, adjust=False).mean().to_numpy()
+    if name == "std":
+        return _rolling(x, n).std().to_numpy()
+    if name == "highest":
+        return _rolling(x, n).max().to_numpy()
+    if name == "lowest":
+        return _rolling(x, n).min().to_numpy()
+    if name == "lag":
+        return pd.Series(x).shift(n).to_numpy()
+    if name == "rsi":
+        return _rsi(x, n)
+    if name in ("bb_upper", "bb_lower"):
+        mid = _rolling(x, n).mean().to_numpy()
+        width = 2 * _rolling(x, n).std().to_numpy()
+        return mid + width if name == "bb_upper" else mid - width
+    raise ValueError(f"Fonction inconnue: '{name}'")
+
+_BINARY_OPS = {
+    "+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide,
+    "<": np.less, "<=": np.less_equal, ">": np.greater, ">=": np.greater_equal,
+    "==": np.equal, "!=": np.not_equal,
+    "and": np.logical_and, "or": np.logical_or,
+}
+
+def _truth(values):
+
+    # Valeur logique d'un tableau : NaN (période de chauffe des indicateurs) -> False
+    values = np.asarray(values)
+    if values.dtype == bool:
+        return values
+    return np.nan_to_num(values.astype(float), nan=0.0) != 0
+
+def _evaluate(node, env, memo):
+
+    # Mémo partagé : chaque sous-expression (et chaque indicateur) n'est calculée qu'une fois
+    if node in memo:
+        return memo[node]
+
+    kind = node[0]
+    if kind == "num":
+        result = np.full(env["_length"], node[1])
+    elif kind == "var":
+        if node[1] not in env:
+            raise ValueError(f"Colonne indisponible: '{node[1]}'")
+        result = env[node[1]]
+    elif kind == "neg":
+        result = -_evaluate(node[1], env, memo)
+    elif kind == "not":
+        result = ~_truth(_evaluate(node[1], env, memo))
+    elif kind == "bin":
+        left = _evaluate(node[2], env, memo)
+        right = _evaluate(node[3], env, memo)
+        if node[1] in ("and", "or"):
+            left, right = _truth(left), _truth(right)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = _BINARY_OPS[node[1]](left, right)
+    else:
+        windows = FUNCTIONS[node[1]][1]
+        args = [None if i in windows else _evaluate(arg, env, memo) for i, arg in enumerate(node[2])]
+        result = _call(node[1], args, node[2])
+
+    memo[node] = result
+    return result
+
+def build_environment(df, price):
+
+    env = {"close": price.to_numpy(dtype=float), "_length": len(df)}
+    for name in VARIABLES[1:]:
+        column = name.capitalize()
+        if isinstance(df.get(column), pd.Series):
+            env[name] = df[column].to_numpy(dtype=float)
+    return env
+
+def evaluate_rule(text, env, memo=None):
+
+    memo = {} if memo is None else memo
+    return _truth(_evaluate(compile_rule(text), env, memo))
+
+def evaluate_rules(df, price, rules):
+
+    # Nombreuses règles sur une même série : indicateurs primitifs partagés via le mémo
+    env = build_environment(df, price)
+    memo = {}
+    return {rule: evaluate_rule(rule, env, memo) for rule in rules}
+
+def rule_to_signal(df, price, entry, exit=None):
+
+    env = build_environment(df, price)
+    memo = {}
+    entries = evaluate_rule(entry, env, memo)
+
+    if exit is None:
+        return pd.Series(entries.astype(float), index=df.index)
+
+    # Avec règle de sortie : position conservée entre entrée et sortie
+    exits = evaluate_rule(exit, env, memo)
+    state = np.where(entries, 1.0, np.where(exits, 0.0, np.nan))
+    return pd.Series(state, index=df.index).ffill().fillna(0.0)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from costs import fixed_bps, sqrt_market_impact
+
+def make_market(n=60):
+
+    index = pd.date_range("2024-01-01", periods=n, freq="D")
+    rng = np.random.default_rng(0)
+    price = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n))), index=index)
+    return pd.DataFrame({'Close': price, 'Volume': np.full(n, 1e6)}, index=index), price
+
+def test_impact_scales_with_trade_size():
+
+    df, price = make_market()
+    position = np.zeros(len(df))
+    position[30:] = 0.000005
+    position[40:] = 1.0
+    position[50:] = -1.0
+    trades = np.diff(position, prepend=np.nan)
+    notional = 1e6 * np.nan_to_num(np.abs(trades))
+
+    cost = sqrt_market_impact()(df, price, trades, notional)
+    sigma = price.pct_change().rolling(20, min_periods=2).std().shift(1).to_numpy()
+    dollar_volume = (df['Volume'] * price).rolling(20, min_periods=1).mean().shift(1).to_numpy()
+    expected = sigma * np.sqrt(notional / dollar_volume) * np.abs(np.nan_to_num(trades))
+
+    np.testing.assert_allclose(cost, np.nan_to_num(expected))
+    # Un micro-ajustement coûte une fraction négligeable du capital
+    assert cost[30] < 1e-8
+    # Un retournement -1 -> +1 paie l'impact sur deux unités d'exposition
+    assert cost[50] > 2 * cost[40]
+
+def test_no_trade_no_cost():
+
+    df, price = make_market()
+    trades = np.zeros(len(df))
+    for model in (fixed_bps(10), sqrt_market_impact()):
+        assert not model(df, price, trades, trades).any()
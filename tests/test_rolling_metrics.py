@@ -0,0 +1,40 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rolling_metrics import rolling_max_drawdown
+
+def naive_max_drawdown(values, window):
+
+    out = np.full(len(values), np.nan)
+    for t in range(window - 1, len(values)):
+        peak, worst = -np.inf, 0.0
+        for v in values[t - window + 1:t + 1]:
+            peak = max(peak, v)
+            worst = max(worst, 1 - v / peak)
+        out[t] = worst
+    return out
+
+def test_peak_outside_window_is_ignored():
+
+    equity = pd.Series([100.0, 50, 50, 50, 50, 50])
+    result = rolling_max_drawdown(equity, 3).to_numpy()
+    np.testing.assert_allclose(result, [np.nan, np.nan, 0.5, 0, 0, 0])
+
+def test_matches_naive_loop():
+
+    rng = np.random.default_rng(0)
+    equity = pd.Series(1000 * np.cumprod(1 + rng.normal(0, 0.03, 500)))
+    for window in (1, 3, 30, 90, 128, 500):
+        np.testing.assert_allclose(
+            rolling_max_drawdown(equity, window).to_numpy(),
+            naive_max_drawdown(equity.to_numpy(), window)
+        )
+
+def test_short_series_is_all_nan():
+
+    assert rolling_max_drawdown(pd.Series([100.0, 90.0]), 3).isna().all()
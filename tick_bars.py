@@ -0,0 +1,229 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from startup import lazy_import
+
+BAR_TYPES = ("time", "tick", "volume", "dollar")
+CHUNK_ROWS = int(os.getenv("NEXUS_TRADES_CHUNK", "2000000"))
+
+# Noms de colonnes acceptés dans les fichiers de trades des exchanges
+_COLUMN_ALIASES = {
+    "timestamp": ("timestamp", "time", "ts", "date", "datetime", "trade_time"),
+    "price": ("price", "px", "p"),
+    "size": ("size", "qty", "quantity", "amount", "volume", "q"),
+}
+
+_FIELDS = ("id", "open", "high", "low", "close", "volume", "dollar", "trades", "first_ts", "last_ts")
+
+def _resolve_columns(names):
+
+    lookup = {str(name).strip().lower(): name for name in names}
+    columns = {}
+    for field, aliases in _COLUMN_ALIASES.items():
+        match = next((lookup[a] for a in aliases if a in lookup), None)
+        if match is None:
+            raise ValueError(f"Colonne '{field}' introuvable (colonnes: {list(names)})")
+        columns[field] = match
+    return columns
+
+def _to_nanoseconds(values):
+
+    # Epoch numérique (s, ms, µs ou ns selon l'ordre de grandeur) ou dates texte
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[ns]").astype(np.int64)
+    if np.issubdtype(values.dtype, np.number):
+        magnitude = np.abs(values[0]) if len(values) else 0
+        factor = 10 ** 9 if magnitude < 1e11 else 10 ** 6 if magnitude < 1e14 else 10 ** 3 if magnitude < 1e17 else 1
+        if np.issubdtype(values.dtype, np.integer):
+            return values.astype(np.int64) * factor
+        return (values * factor).astype(np.int64)
+    return pd.DatetimeIndex(pd.to_datetime(values, utc=True)).asi8
+
+def read_trades(path, chunk_rows=CHUNK_ROWS):
+
+    # Lecture par blocs : mémoire bornée par la taille d'un bloc, fichiers projetés en mémoire
+    if str(path).lower().endswith((".parquet", ".pq")):
+        pq = lazy_import("pyarrow.parquet")
+        parquet = pq.ParquetFile(path, memory_map=True)
+        columns = _resolve_columns(parquet.schema_arrow.names)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=list(columns.values())):
+            yield (
+                _to_nanoseconds(batch.column(columns["timestamp"]).to_numpy(zero_copy_only=False)),
+                batch.column(columns["price"]).to_numpy(zero_copy_only=False).astype(np.float64, copy=False),
+                batch.column(columns["size"]).to_numpy(zero_copy_only=False).astype(np.float64, copy=False),
+            )
+        return
+
+    columns = _resolve_columns(pd.read_csv(path, nrows=0).columns)
+    reader = pd.read_csv(
+        path, usecols=list(columns.values()), chunksize=chunk_rows, memory_map=True,
+        dtype={columns["price"]: np.float64, columns["size"]: np.float64}
+    )
+    for chunk in reader:
+        yield (
+            _to_nanoseconds(chunk[columns["timestamp"]].to_numpy()),
+            chunk[columns["price"]].to_numpy(),
+            chunk[columns["size"]].to_numpy(),
+        )
+
+class BarAggregator:
+
+    # Agrégation incrémentale : les barres complètes sont émises, la barre en cours est reportée au bloc suivant
+
+    def __init__(self, bar_type="time", size="1D"):
+        if bar_type not in BAR_TYPES:
+            raise ValueError(f"Type de barre inconnu: '{bar_type}' (attendu: {', '.join(BAR_TYPES)})")
+        self.bar_type = bar_type
+        self.size = pd.Timedelta(size).value if bar_type == "time" else float(size)
+        if self.size <= 0:
+            raise ValueError("La taille des barres doit être positive")
+        self.count = 0
+        self.cumulative = 0.0
+        self.carry = None
+
+    def _bar_ids(self, ts, price, size):
+        if self.bar_type == "time":
+            return ts // self.size
+        if self.bar_type == "tick":
+            return (self.count + np.arange(len(ts))) // int(self.size)
+
+        # Volume / dollar : une barre se ferme quand le cumul franchit un multiple du seuil
+        amount = size if self.bar_type == "volume" else price * size
+        cumulative = self.cumulative + np.cumsum(amount)
+        self.cumulative = cumulative[-1]
+        return ((cumulative - amount) // self.size).astype(np.int64)
+
+    def update(self, ts, price, size):
+        n = len(ts)
+        if n == 0:
+            return None
+        if np.any(ts[1:] < ts[:-1]):
+            order = np.argsort(ts, kind="stable")
+            ts, price, size = ts[order], price[order], size[order]
+
+        ids = self._bar_ids(ts, price, size)
+        self.count += n
+
+        # Réductions groupées vectorisées : identifiants de barre croissants -> segments contigus
+        starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+        ends = np.concatenate([starts[1:], [n]]) - 1
+        bars = {
+            "id": ids[starts],
+            "open": price[starts],
+            "high": np.maximum.reduceat(price, starts),
+            "low": np.minimum.reduceat(price, starts),
+            "close": price[ends],
+            "volume": np.add.reduceat(size, starts),
+            "dollar": np.add.reduceat(price * size, starts),
+            "trades": ends - starts + 1,
+            "first_ts": ts[starts],
+            "last_ts": ts[ends],
+        }
+
+        carry = self.carry
+        if carry is not None:
+            if carry["id"][0] == bars["id"][0]:
+                # La barre reportée se poursuit dans ce bloc
+                bars["open"][0] = carry["open"][0]
+                bars["high"][0] = max(bars["high"][0], carry["high"][0])
+                bars["low"][0] = min(bars["low"][0], carry["low"][0])
+                bars["volume"][0] += carry["volume"][0]
+                bars["dollar"][0] += carry["dollar"][0]
+                bars["trades"][0] += carry["trades"][0]
+                bars["first_ts"][0] = carry["first_ts"][0]
+            else:
+                bars = {k: np.concatenate([carry[k], bars[k]]) for k in _FIELDS}
+
+        self.carry = {k: bars[k][-1:].copy() for k in _FIELDS}
+        if len(bars["id"]) == 1:
+            return None
+        return self._frame({k: bars[k][:-1] for k in _FIELDS})
+
+    def flush(self):
+        carry, self.carry = self.carry, None
+        return None if carry is None else self._frame(carry)
+
+    def _frame(self, bars):
+        # Même forme que les barres Yahoo : Open/High/Low/Close/Volume indexés par date
+        if self.bar_type == "time":
+            index = pd.to_datetime(bars["id"] * self.size)
+        else:
+            index = pd.to_datetime(bars["last_ts"])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = bars["dollar"] / bars["volume"]
+        return pd.DataFrame({
+            "Open": bars["open"],
+            "High": bars["high"],
+            "Low": bars["low"],
+            "Close": bars["close"],
+            "Volume": bars["volume"],
+            "Trades": bars["trades"],
+            "VWAP": vwap,
+        }, index=pd.DatetimeIndex(index, name="Date"))
+
+def aggregate_trades(path, bar_type="time", size="1D", chunk_rows=CHUNK_ROWS):
+
+    aggregator = BarAggregator(bar_type, size)
+    frames = []
+    for ts, price, size_ in read_trades(path, chunk_rows):
+        frame = aggregator.update(ts, price, size_)
+        if frame is not None:
+            frames.append(frame)
+    last = aggregator.flush()
+    if last is not None:
+        frames.append(last)
+    return pd.concat(frames) if frames else pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+
+def find_trade_file(directory, ticker):
+
+    # Fichiers nommés par symbole : BTC-USD.parquet, BTC.csv, ...
+    names = (ticker, ticker.replace("-USD", ""))
+    for name in names:
+        for ext in (".parquet", ".pq", ".csv"):
+            path = os.path.join(directory, name + ext)
+            if os.path.exists(path):
+                return path
+    return None
+
+def make_trade_source(directory, bar_type="time", size="1D", chunk_rows=CHUNK_ROWS):
+
+    # Source de données pour data_loader : barres construites depuis les fichiers de trades locaux
+    def source(ticker, period="max"):
+        path = find_trade_file(directory, ticker)
+        if path is None:
+            return pd.DataFrame()
+        return aggregate_trades(path, bar_type, size, chunk_rows)
+
+    return source
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Agrégation de fichiers de trades en barres OHLCV")
+    parser.add_argument("path", help="Fichier de trades (CSV ou Parquet)")
+    parser.add_argument("--bars", choices=BAR_TYPES, default="time")
+    parser.add_argument("--size", default="1D", help="Durée (ex: 1D, 5min) ou seuil (trades, volume, dollars)")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--output", help="Fichier de sortie (.parquet ou .csv)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    bars = aggregate_trades(args.path, args.bars, args.size, args.chunk)
+    duration = time.perf_counter() - start
+    trades = int(bars["Trades"].sum()) if "Trades" in bars else 0
+    print(f"{len(bars)} barres, {trades:,} trades en {duration:.2f}s ({trades / duration * 60 / 1e6:.1f} M trades/min)")
+
+    if args.output:
+        if args.output.endswith(".parquet"):
+            bars.to_parquet(args.output)
+        else:
+            bars.to_csv(args.output)
+    else:
+        print(bars.tail())
+
+if __name__ == "__main__":
+    main()
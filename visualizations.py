@@ -1,9 +1,9 @@
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import numpy as np
-from scipy import stats
+from analytics import histogram_density, kde_on_grid, qq_quantiles
 
-def plot_price_with_indicators(df, ticker):
+def plot_price_with_indicators(df, ticker, vol_bands=None):
     
     fig = make_subplots(
         rows=3, cols=1,
@@ -41,6 +41,22 @@ def plot_price_with_indicators(df, ticker):
         row=1, col=1
     )
     
+    # Bandes de volatilité GARCH (historique à un pas + cône de prévision)
+    if vol_bands is not None:
+        history, cone = vol_bands
+        for frame, label, dash in ((history, 'Vol GARCH', 'dot'), (cone, 'Prévision GARCH', 'solid')):
+            fig.add_trace(
+                go.Scatter(x=frame.index, y=frame['Vol_Haute'], name=f'{label} +', 
+                           line=dict(color='rgba(0,191,255,0.6)', width=1, dash=dash)),
+                row=1, col=1
+            )
+            fig.add_trace(
+                go.Scatter(x=frame.index, y=frame['Vol_Basse'], name=f'{label} -', 
+                           line=dict(color='rgba(0,191,255,0.6)', width=1, dash=dash),
+                           fill='tonexty' if label != 'Vol GARCH' else None, fillcolor='rgba(0,191,255,0.1)'),
+                row=1, col=1
+            )
+    
     # === الرسم الثاني: RSI ===
     fig.add_trace(
         go.Scatter(x=df.index, y=df['RSI'], name='RSI', line=dict(color='#9467bd', width=2)),
@@ -85,28 +101,40 @@ def plot_returns_histogram(df):
     
     fig = go.Figure()
     
-    # Histogramme
-    fig.add_trace(go.Histogram(
-        x=returns,
-        nbinsx=50,
+    # Histogramme (classes calculées côté serveur)
+    centers, density, widths = histogram_density(returns, bins=50)
+    fig.add_trace(go.Bar(
+        x=centers,
+        y=density,
+        width=widths,
         name='Rendements',
         marker_color='#f0b90b',
-        opacity=0.7,
-        histnorm='probability density'
+        opacity=0.7
     ))
     
-    # Courbe de densité normale théorique
-    mu = returns.mean()
-    sigma = returns.std()
-    x = np.linspace(returns.min(), returns.max(), 100)
-    y = stats.norm.pdf(x, mu, sigma)
-    
-    fig.add_trace(go.Scatter(
-        x=x, y=y,
-        mode='lines',
-        name='Distribution Normale',
-        line=dict(color='red', width=2)
-    ))
+    # Densité empirique (KDE) évaluée sur une grille fixe (absente pour une série plate ou trop courte)
+    kde = kde_on_grid(returns)
+    if kde is not None:
+        kde_x, kde_y = kde
+        fig.add_trace(go.Scatter(
+            x=kde_x, y=kde_y,
+            mode='lines',
+            name='Densité Estimée (KDE)',
+            line=dict(color='#00bfff', width=2)
+        ))
+        
+        # Courbe de densité normale théorique
+        mu = returns.mean()
+        sigma = returns.std()
+        x = np.linspace(returns.min(), returns.max(), 100)
+        y = np.exp(-0.5 * ((x - mu) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+        
+        fig.add_trace(go.Scatter(
+            x=x, y=y,
+            mode='lines',
+            name='Distribution Normale',
+            line=dict(color='red', width=2)
+        ))
     
     fig.update_layout(
         title='Distribution des Rendements Logarithmiques',
@@ -114,6 +142,7 @@ def plot_returns_histogram(df):
         yaxis_title='Densité',
         template='plotly_dark',
         showlegend=True,
+        bargap=0,
         height=400
     )
     
@@ -123,9 +152,8 @@ def plot_qq_plot(df):
     
     returns = df['Returns_Log'].dropna()
     
-    # Calcul des quantiles
-    theoretical_quantiles = stats.probplot(returns, dist="norm")[0][0]
-    sample_quantiles = stats.probplot(returns, dist="norm")[0][1]
+    # Calcul des quantiles (nombre de points fixe, queues denses)
+    theoretical_quantiles, sample_quantiles = qq_quantiles(returns)
     
     fig = go.Figure()
     
@@ -204,9 +232,8 @@ def plot_equity_curve_with_drawdown(df, initial_capital):
                   line_color="gray", row=1, col=1,
                   annotation_text=f"Capital Initial: ${initial_capital:,.0f}")
     
-    # Drawdown
-    roll_max = df['Equity_Curve'].cummax()
-    drawdown = ((df['Equity_Curve'] - roll_max) / roll_max) * 100
+    # Drawdown (déjà calculé par le backtest)
+    drawdown = df['Drawdown'] * 100
     
     fig.add_trace(
         go.Scatter(x=df.index, y=drawdown,
@@ -227,6 +254,96 @@ def plot_equity_curve_with_drawdown(df, initial_capital):
     
     return fig
 
+def plot_rolling_metrics(rolling_df, window):
+    
+    fig = make_subplots(
+        rows=3, cols=1,
+        shared_xaxes=True,
+        vertical_spacing=0.06,
+        subplot_titles=(f'Sharpe / Sortino ({window} barres)', 'Win Rate / Profit Factor', 'Max Drawdown Glissant')
+    )
+    
+    fig.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df[f'Sharpe_{window}'],
+                             name='Sharpe', line=dict(color='#f0b90b', width=2)), row=1, col=1)
+    fig.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df[f'Sortino_{window}'],
+                             name='Sortino', line=dict(color='#00bfff', width=1)), row=1, col=1)
+    fig.add_hline(y=0, line_dash="dash", line_color="gray", row=1, col=1)
+    
+    fig.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df[f'WinRate_{window}'] * 100,
+                             name='Win Rate (%)', line=dict(color='#00ff00', width=1)), row=2, col=1)
+    fig.add_trace(go.Scatter(x=rolling_df.index, y=rolling_df[f'ProfitFactor_{window}'],
+                             name='Profit Factor', line=dict(color='#9467bd', width=1)), row=2, col=1)
+    
+    fig.add_trace(go.Scatter(x=rolling_df.index, y=-rolling_df[f'MaxDD_{window}'] * 100,
+                             name='Max DD (%)', line=dict(color='#ff4b4b', width=1),
+                             fill='tozeroy', fillcolor='rgba(255,75,75,0.3)'), row=3, col=1)
+    
+    fig.update_layout(
+        height=650,
+        template='plotly_dark',
+        showlegend=True,
+        hovermode='x unified'
+    )
+    
+    fig.update_yaxes(title_text="Ratio", row=1, col=1)
+    fig.update_yaxes(title_text="% / PF", row=2, col=1)
+    fig.update_yaxes(title_text="Drawdown (%)", row=3, col=1)
+    
+    return fig
+
+def plot_strategy_regimes(sharpe_df, window):
+    
+    fig = go.Figure()
+    colors = ['#f0b90b', '#00bfff', '#00ff00', '#9467bd', '#ff4b4b']
+    
+    for i, col in enumerate(sharpe_df.columns):
+        fig.add_trace(go.Scatter(
+            x=sharpe_df.index, y=sharpe_df[col],
+            mode='lines', name=col,
+            line=dict(color=colors[i % len(colors)], width=2 if i == 0 else 1)
+        ))
+    
+    fig.add_hline(y=0, line_dash="dash", line_color="gray")
+    fig.update_layout(
+        title=f'Sharpe Glissant ({window} barres) par Stratégie',
+        xaxis_title='Date',
+        yaxis_title='Sharpe Annualisé',
+        template='plotly_dark',
+        height=400,
+        hovermode='x unified'
+    )
+    
+    return fig
+
+def plot_rolling_var(var_df, cvar_df, level, method='Historique'):
+    
+    fig = go.Figure()
+    colors = ['#f0b90b', '#00bfff', '#9467bd', '#00ff00']
+    
+    for i, col in enumerate(var_df.columns):
+        color = colors[i % len(colors)]
+        fig.add_trace(go.Scatter(
+            x=var_df.index, y=var_df[col] * 100,
+            mode='lines', name=f'VaR {level:.0%} - {col}',
+            line=dict(color=color, width=2)
+        ))
+        fig.add_trace(go.Scatter(
+            x=cvar_df.index, y=cvar_df[col] * 100,
+            mode='lines', name=f'CVaR {level:.0%} - {col}',
+            line=dict(color=color, width=1, dash='dot')
+        ))
+    
+    fig.update_layout(
+        title=f'VaR / CVaR Glissantes ({method})',
+        xaxis_title='Date',
+        yaxis_title='Perte Journalière (%)',
+        template='plotly_dark',
+        height=400,
+        hovermode='x unified'
+    )
+    
+    return fig
+
 def plot_correlation_heatmap(corr_matrix):
     
     fig = go.Figure(data=go.Heatmap(